@@ -0,0 +1 @@
+PYTHONPATH=src python3 -m benchmarks "$@"
\ No newline at end of file
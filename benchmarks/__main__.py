@@ -0,0 +1,230 @@
+"""Run the benchmark suite on a synthetic corpus and save the results as JSON.
+
+Usage: PYTHONPATH=src python3 -m benchmarks [--pages N] [--output results.json]
+                                            [--compare baseline.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import DEFAULT_BLOCK_MIX, CorpusGenerator, parse_block_mix
+from copystatic import copy_tree
+from generate_page import collect_pages, generate_pages
+from inline_markdown import text_to_textnodes
+from markdown_blocks import markdown_to_blocks, markdown_to_html_node
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(function):
+        BENCHMARKS[name] = function
+        return function
+
+    return register
+
+
+class Workload:
+    def __init__(self, root, args):
+        generator = CorpusGenerator(
+            args.seed, args.block_mix, args.inline_density, args.words_per_block
+        )
+        self.root = root
+        self.content, self.static, self.template = generator.write_site(
+            root, args.pages, args.blocks_per_page, args.assets
+        )
+        self.pages = collect_pages(self.content, os.path.join(root, "docs"))
+        self.markdown = []
+        for from_path, _ in self.pages:
+            with open(from_path, "r") as f:
+                self.markdown.append(f.read())
+        self.inline_texts = [
+            " ".join(block.split())
+            for markdown in self.markdown
+            for block in markdown_to_blocks(markdown)
+            if not block.startswith("```")
+        ]
+
+
+@benchmark("text_to_textnodes")
+def bench_text_to_textnodes(workload):
+    def run():
+        for text in workload.inline_texts:
+            text_to_textnodes(text)
+
+    return None, run, len(workload.inline_texts), "blocks"
+
+
+@benchmark("markdown_to_html_node")
+def bench_markdown_to_html_node(workload):
+    def run():
+        for markdown in workload.markdown:
+            markdown_to_html_node(markdown)
+
+    return None, run, len(workload.markdown), "pages"
+
+
+@benchmark("to_html")
+def bench_to_html(workload):
+    trees = [markdown_to_html_node(markdown) for markdown in workload.markdown]
+
+    def run():
+        for tree in trees:
+            tree.to_html()
+
+    return None, run, len(trees), "pages"
+
+
+@benchmark("generate_page")
+def bench_generate_page(workload):
+    def run():
+        failures, _ = generate_pages(workload.pages, workload.template)
+        if failures:
+            raise RuntimeError(f"Benchmark pages failed to render: {failures}")
+
+    return None, run, len(workload.pages), "pages"
+
+
+@benchmark("copy_tree")
+def bench_copy_tree(workload):
+    destination = os.path.join(workload.root, "static-copy")
+    files = sum(len(names) for _, _, names in os.walk(workload.static))
+
+    def prepare():
+        shutil.rmtree(destination, ignore_errors=True)
+
+    def run():
+        copy_tree(workload.static, destination)
+
+    return prepare, run, files, "files"
+
+
+def run_benchmark(function, workload, repeat):
+    prepare, run, items, unit = function(workload)
+    timings = []
+    for _ in range(repeat):
+        if prepare is not None:
+            prepare()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    seconds = min(timings)
+    return {
+        "seconds": seconds,
+        "items": items,
+        "unit": unit,
+        "per_second": items / seconds if seconds else None,
+        "timings": timings,
+    }
+
+
+def git_commit():
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"{'benchmark':<24} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in results["benchmarks"].items():
+        previous = baseline["benchmarks"].get(name)
+        if previous is None:
+            continue
+        change = result["seconds"] / previous["seconds"] - 1
+        flag = "  REGRESSION" if change > threshold else ""
+        if flag:
+            regressions.append(name)
+        print(
+            f"{name:<24} {previous['seconds']:>10.4f} {result['seconds']:>10.4f} "
+            f"{change:>+8.1%}{flag}"
+        )
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="benchmarks", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--blocks-per-page", type=int, default=40)
+    parser.add_argument("--words-per-block", type=int, default=40)
+    parser.add_argument(
+        "--block-mix",
+        type=parse_block_mix,
+        default=DEFAULT_BLOCK_MIX,
+        help="weights per block type, e.g. paragraph=6,code=1,unordered_list=2",
+    )
+    parser.add_argument(
+        "--inline-density",
+        type=float,
+        default=0.1,
+        help="fraction of words wrapped in inline markup",
+    )
+    parser.add_argument("--assets", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--only", action="append", choices=sorted(BENCHMARKS), default=None
+    )
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="compare against a previous JSON result")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="slowdown ratio reported as a regression by --compare",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "config": {
+            "pages": args.pages,
+            "blocks_per_page": args.blocks_per_page,
+            "words_per_block": args.words_per_block,
+            "block_mix": args.block_mix,
+            "inline_density": args.inline_density,
+            "assets": args.assets,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "benchmarks": {},
+    }
+    with tempfile.TemporaryDirectory() as root:
+        workload = Workload(root, args)
+        for name in args.only or BENCHMARKS:
+            result = run_benchmark(BENCHMARKS[name], workload, args.repeat)
+            results["benchmarks"][name] = result
+            print(
+                f"{name:<24} {result['seconds']:>10.4f}s "
+                f"{result['per_second']:>12.0f} {result['unit']}/s"
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Block classification and conversion: regex table vs the old if/elif chain.
+
+Usage: PYTHONPATH=src python3 -m benchmarks.block_classification [--blocks N]
+"""
+
+import argparse
+import re
+import timeit
+
+from benchmarks.corpus import CorpusGenerator
+from htmlnode import LeafNode, ParentNode
+from markdown_blocks import (
+    BlockType,
+    block_to_block_type,
+    code_to_html_node,
+    create_html_node,
+    heading_to_html_node,
+    quote_to_html_node,
+    text_to_children,
+)
+
+
+def legacy_block_to_block_type(markdown):
+    if re.match(r"^#{1,6} ", markdown):
+        return BlockType.HEADING
+    elif re.match(r"```[\s\S]*?```", markdown):
+        return BlockType.CODE
+    elif re.match(r"^> ", markdown):
+        return BlockType.QUOTE
+    elif re.match(r"^-\s", markdown):
+        return BlockType.UNORDERED_LIST
+    elif re.match(r"^\d+\.\s", markdown):
+        return BlockType.ORDERED_LIST
+    else:
+        return BlockType.PARAGRAPH
+
+
+def legacy_paragraph_to_html_node(paragraph):
+    normalized_text = re.sub(r"\s+", " ", paragraph).strip()
+    return ParentNode(tag="p", children=text_to_children(normalized_text))
+
+
+def legacy_unordered_list_to_html_node(block):
+    items = [item.strip() for item in block.split("\n")]
+    items = [re.sub(r"^-\s", "", item) for item in items]
+    list_items = [
+        ParentNode(tag="li", children=text_to_children(item)) for item in items
+    ]
+    list_items = []
+    for item in items:
+        children = text_to_children(item)
+        if not children:
+            list_items.append(LeafNode(tag="li", value=""))
+        else:
+            list_items.append(ParentNode(tag="li", children=children))
+    return ParentNode(tag="ul", children=list_items)
+
+
+def legacy_ordered_list_to_html_node(block):
+    items = [item.strip() for item in block.split("\n")]
+    items = [re.sub(r"^\d+\.\s+", "", item) for item in items]
+    list_items = [
+        ParentNode(tag="li", children=text_to_children(item)) for item in items
+    ]
+    return ParentNode(tag="ol", children=list_items)
+
+
+def legacy_create_html_node(block, block_type):
+    if block_type == BlockType.PARAGRAPH:
+        return legacy_paragraph_to_html_node(block)
+    elif block_type == BlockType.HEADING:
+        return heading_to_html_node(block)
+    elif block_type == BlockType.CODE:
+        return code_to_html_node(block)
+    elif block_type == BlockType.QUOTE:
+        return quote_to_html_node(block)
+    elif block_type == BlockType.UNORDERED_LIST:
+        return legacy_unordered_list_to_html_node(block)
+    elif block_type == BlockType.ORDERED_LIST:
+        return legacy_ordered_list_to_html_node(block)
+    else:
+        raise ValueError(f"Unknown block type: {block_type}")
+
+
+def best_of(function, number, repeat=5):
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--blocks", type=int, default=5000)
+    args = parser.parse_args()
+
+    blocks = CorpusGenerator().blocks(args.blocks)
+    types = [block_to_block_type(block) for block in blocks]
+    assert types == [legacy_block_to_block_type(block) for block in blocks]
+
+    results = [
+        (
+            "classify",
+            best_of(lambda: [legacy_block_to_block_type(b) for b in blocks], 5),
+            best_of(lambda: [block_to_block_type(b) for b in blocks], 5),
+        ),
+        (
+            "convert",
+            best_of(
+                lambda: [legacy_create_html_node(b, t) for b, t in zip(blocks, types)],
+                1,
+            ),
+            best_of(lambda: [create_html_node(b, t) for b, t in zip(blocks, types)], 1),
+        ),
+    ]
+    print(f"{'stage':<10} {'before (ms)':>12} {'after (ms)':>12} {'speedup':>8}")
+    for stage, before, after in results:
+        print(
+            f"{stage:<10} {before * 1000:>12.2f} {after * 1000:>12.2f} "
+            f"{before / after:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Serial vs threaded sync_tree on a tree of many small files.
+
+Usage: PYTHONPATH=src python3 -m benchmarks.copy_tree [--files N] [--workers 1,4,8,16]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from copystatic import sync_tree
+
+
+def make_tree(root, files, directories, size):
+    payload = os.urandom(size)
+    for index in range(files):
+        directory = os.path.join(root, f"dir{index % directories:03}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"file{index:06}.bin"), "wb") as f:
+            f.write(payload)
+
+
+def time_copy(copy, source, destination):
+    shutil.rmtree(destination, ignore_errors=True)
+    start = time.perf_counter()
+    copy(source, destination)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--directories", type=int, default=50)
+    parser.add_argument("--size", type=int, default=2048)
+    parser.add_argument("--workers", default="2,4,8,16")
+    parser.add_argument("--dir", default=None, help="where to create the trees")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as root:
+        source = os.path.join(root, "source")
+        destination = os.path.join(root, "destination")
+        make_tree(source, args.files, args.directories, args.size)
+
+        serial = time_copy(sync_tree, source, destination)
+        print(f"{'mode':<12} {'seconds':>8} {'files/s':>10} {'speedup':>8}")
+        print(f"{'serial':<12} {serial:>8.3f} {args.files / serial:>10.0f} {1:>7.2f}x")
+        for workers in [int(value) for value in args.workers.split(",")]:
+            elapsed = time_copy(
+                lambda s, d: sync_tree(s, d, workers=workers), source, destination
+            )
+            print(
+                f"{f'threads={workers}':<12} {elapsed:>8.3f} "
+                f"{args.files / elapsed:>10.0f} {serial / elapsed:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Deterministic synthetic markdown corpus for benchmarks."""
+
+import os
+import random
+
+WORDS = (
+    "the ring of power was forged in secret fire by sauron lord of mordor "
+    "while elves dwarves and men gathered at rivendell beneath misty mountains"
+).split()
+BLOCK_TYPES = (
+    "paragraph",
+    "heading",
+    "code",
+    "quote",
+    "unordered_list",
+    "ordered_list",
+)
+DEFAULT_BLOCK_MIX = {
+    "paragraph": 6,
+    "heading": 2,
+    "code": 1,
+    "quote": 1,
+    "unordered_list": 1,
+    "ordered_list": 1,
+}
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>
+"""
+
+
+def parse_block_mix(text: str) -> dict[str, int]:
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        if name not in BLOCK_TYPES:
+            raise ValueError(f"Unknown block type: {name}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+class CorpusGenerator:
+    def __init__(
+        self,
+        seed=0,
+        block_mix=None,
+        inline_density=0.1,
+        words_per_block=40,
+    ):
+        self.rng = random.Random(seed)
+        mix = block_mix or DEFAULT_BLOCK_MIX
+        self.block_types = list(mix)
+        self.block_weights = [mix[name] for name in self.block_types]
+        self.inline_density = inline_density
+        self.words_per_block = words_per_block
+
+    def word(self) -> str:
+        word = self.rng.choice(WORDS)
+        if self.rng.random() >= self.inline_density:
+            return word
+        markup = self.rng.randrange(5)
+        if markup == 0:
+            return f"**{word}**"
+        if markup == 1:
+            return f"_{word}_"
+        if markup == 2:
+            return f"`{word}`"
+        if markup == 3:
+            return f"[{word}](/blog/{word})"
+        return f"![{word}](/images/{word}.png)"
+
+    def sentence(self, words: int) -> str:
+        return " ".join(self.word() for _ in range(max(1, words)))
+
+    def plain_sentence(self, words: int) -> str:
+        return " ".join(self.rng.choice(WORDS) for _ in range(max(1, words)))
+
+    def block(self, block_type: str) -> str:
+        words = self.words_per_block
+        if block_type == "heading":
+            return f"{'#' * self.rng.randint(2, 6)} {self.sentence(words // 8)}"
+        if block_type == "code":
+            lines = [self.plain_sentence(words // 5) for _ in range(5)]
+            return "```\n" + "\n".join(lines) + "\n```"
+        if block_type == "quote":
+            return "\n".join(f"> {self.sentence(words // 3)}" for _ in range(3))
+        if block_type == "unordered_list":
+            return "\n".join(f"- {self.sentence(words // 5)}" for _ in range(5))
+        if block_type == "ordered_list":
+            return "\n".join(
+                f"{index}. {self.sentence(words // 5)}" for index in range(1, 6)
+            )
+        return self.sentence(words)
+
+    def blocks(self, count: int) -> list[str]:
+        types = self.rng.choices(self.block_types, self.block_weights, k=count)
+        return [self.block(block_type) for block_type in types]
+
+    def page(self, blocks: int) -> str:
+        title = f"# {self.plain_sentence(4)}"
+        return "\n\n".join([title] + self.blocks(blocks)) + "\n"
+
+    def write_site(self, root: str, pages: int, blocks_per_page: int, assets=0):
+        content = os.path.join(root, "content")
+        for index in range(pages):
+            directory = os.path.join(content, f"section{index % 10}", f"page{index}")
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, "index.md"), "w") as f:
+                f.write(self.page(blocks_per_page))
+        static = os.path.join(root, "static")
+        os.makedirs(os.path.join(static, "images"), exist_ok=True)
+        with open(os.path.join(static, "index.css"), "w") as f:
+            f.write("body { margin: 0 auto; max-width: 40em; }\n")
+        for index in range(assets):
+            name = f"{WORDS[index % len(WORDS)]}{index}.png"
+            with open(os.path.join(static, "images", name), "wb") as f:
+                f.write(self.rng.randbytes(2048))
+        with open(os.path.join(root, "template.html"), "w") as f:
+            f.write(TEMPLATE)
+        return content, static, os.path.join(root, "template.html")
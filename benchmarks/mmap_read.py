@@ -0,0 +1,96 @@
+"""Peak RSS and time for reading one large page: f.read() vs lines vs mmap.
+
+Usage: PYTHONPATH=src python3 -m benchmarks.mmap_read [--mb N] [--parse]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import CorpusGenerator
+from markdown_blocks import (
+    iter_markdown_blocks,
+    iter_mmap_blocks,
+    markdown_to_blocks,
+    markdown_to_html_node,
+)
+
+MODES = ("read", "lines", "mmap")
+
+
+def read_blocks(mode, path):
+    if mode == "read":
+        with open(path, "r") as f:
+            yield from markdown_to_blocks(f.read())
+    elif mode == "lines":
+        with open(path, "r") as f:
+            yield from iter_markdown_blocks(f)
+    else:
+        yield from iter_mmap_blocks(path)
+
+
+def run_child(mode, path, parse):
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    blocks = read_blocks(mode, path)
+    if parse:
+        count = len(markdown_to_html_node(blocks).children)
+    else:
+        count = sum(1 for _ in blocks)
+    elapsed = time.perf_counter() - start
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"blocks": count, "seconds": elapsed, "rss_kib": after - before}))
+
+
+def measure(mode, path, parse):
+    command = [sys.executable, "-m", "benchmarks.mmap_read", "--child", mode, path]
+    if parse:
+        command.append("--parse")
+    output = subprocess.run(command, check=True, capture_output=True, text=True)
+    return json.loads(output.stdout)
+
+
+def write_page(path, megabytes, seed):
+    generator = CorpusGenerator(seed)
+    size = 0
+    with open(path, "w") as f:
+        f.write("# Large page\n\n")
+        while size < megabytes * 1024 * 1024:
+            text = "\n\n".join(generator.blocks(100)) + "\n\n"
+            f.write(text)
+            size += len(text.encode("utf-8"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=int, default=64, help="size of the page")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--parse", action="store_true", help="also build the HTML node tree"
+    )
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"))
+    parser.add_argument("--dir", default=None, help="where to create the page")
+    args = parser.parse_args()
+    if args.child:
+        run_child(*args.child, args.parse)
+        return
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as root:
+        path = os.path.join(root, "index.md")
+        write_page(path, args.mb, args.seed)
+        print(f"{'mode':<8} {'blocks':>8} {'seconds':>8} {'peak RSS MiB':>13}")
+        for mode in MODES:
+            result = measure(mode, path, args.parse)
+            print(
+                f"{mode:<8} {result['blocks']:>8} {result['seconds']:>8.3f} "
+                f"{result['rss_kib'] / 1024:>13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
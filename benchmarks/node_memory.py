@@ -0,0 +1,105 @@
+"""Object count and memory per page for the slotted node classes.
+
+Usage: PYTHONPATH=src python3 -m benchmarks.node_memory [--repeat N]
+"""
+
+import argparse
+import gc
+import glob
+import os
+import tracemalloc
+
+from htmlnode import LeafNode, ParentNode
+from inline_markdown import text_to_textnodes
+from markdown_blocks import markdown_to_blocks, markdown_to_html_node
+from textnode import TextNode
+
+
+class DictHTMLNode:
+    def __init__(self, tag, value, children, props):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+
+class DictTextNode:
+    def __init__(self, text, text_type, url):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+def copy_html_tree(node, dict_backed):
+    children = None
+    if node.children is not None:
+        children = [copy_html_tree(child, dict_backed) for child in node.children]
+    if dict_backed:
+        return DictHTMLNode(node.tag, node.value, children, node.props)
+    if children is None:
+        return LeafNode(node.value, node.tag, node.props)
+    return ParentNode(node.tag, children, node.props)
+
+
+def copy_text_nodes(nodes, dict_backed):
+    node_class = DictTextNode if dict_backed else TextNode
+    return [node_class(node.text, node.text_type, node.url) for node in nodes]
+
+
+def count_html_nodes(node):
+    return 1 + sum(count_html_nodes(child) for child in node.children or [])
+
+
+def page_text_nodes(markdown):
+    nodes = []
+    for block in markdown_to_blocks(markdown):
+        if block.startswith("```"):
+            continue
+        nodes.extend(text_to_textnodes(" ".join(block.split())))
+    return nodes
+
+
+def traced_size(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def measure_page(markdown):
+    tree = markdown_to_html_node(markdown)
+    text_nodes = page_text_nodes(markdown)
+    sizes = {}
+    for dict_backed in (True, False):
+        _, sizes[dict_backed] = traced_size(
+            lambda: (
+                copy_html_tree(tree, dict_backed),
+                copy_text_nodes(text_nodes, dict_backed),
+            )
+        )
+    return count_html_nodes(tree) + len(text_nodes), sizes[True], sizes[False]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--content", default="content")
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'page':<40} {'objects':>9} {'before':>12} {'after':>12} {'saved':>7}")
+    for path in sorted(
+        glob.glob(os.path.join(args.content, "**", "*.md"), recursive=True)
+    ):
+        with open(path, "r") as f:
+            markdown = "\n\n".join([f.read()] * args.repeat)
+        objects, before, after = measure_page(markdown)
+        print(
+            f"{path:<40} {objects:>9} {before:>12,} {after:>12,} "
+            f"{1 - after / before:>6.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
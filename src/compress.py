@@ -0,0 +1,178 @@
+import gzip
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from copystatic import collect_files, remove_file
+from manifest import hash_file
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_STATE_VERSION = 1
+DEFAULT_COMPRESS_STATE_PATH = ".build/compress.json"
+DEFAULT_COMPRESS_MIN_BYTES = 1024
+DEFAULT_COMPRESS_MAX_RATIO = 0.9
+COMPRESSED_SUFFIXES = (".gz", ".br")
+SKIPPED_EXTENSIONS = (
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".webp",
+    ".woff",
+    ".woff2",
+    ".zip",
+) + COMPRESSED_SUFFIXES
+
+
+class CompressBuild:
+    def __init__(self):
+        self.outputs = []
+        self.compressed = 0
+        self.reused = 0
+        self.skipped = 0
+
+    def __repr__(self):
+        return (
+            f"CompressBuild(outputs={len(self.outputs)}, "
+            f"compressed={self.compressed}, reused={self.reused}, "
+            f"skipped={self.skipped})"
+        )
+
+
+def compress_encodings() -> tuple[str, ...]:
+    return (".gz", ".br") if brotli is not None else (".gz",)
+
+
+def compress_bytes(data: bytes, suffix: str) -> bytes:
+    if suffix == ".gz":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return brotli.compress(data)
+
+
+def compressed_siblings(paths) -> list[str]:
+    return [path + suffix for path in paths for suffix in COMPRESSED_SUFFIXES]
+
+
+def remove_siblings(path: str, keep=()):
+    for suffix in COMPRESSED_SUFFIXES:
+        if suffix not in keep and os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def compress_file(path: str, encodings, max_ratio: float) -> list[str]:
+    with open(path, "rb") as f:
+        data = f.read()
+    written = []
+    for suffix in encodings:
+        compressed = compress_bytes(data, suffix)
+        if len(compressed) > len(data) * max_ratio:
+            continue
+        temp_path = f"{path}{suffix}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(compressed)
+        os.replace(temp_path, path + suffix)
+        written.append(suffix)
+    remove_siblings(path, written)
+    return written
+
+
+def load_compress_state(state_path: str, settings: dict) -> dict:
+    empty = {"version": COMPRESS_STATE_VERSION, "settings": settings, "files": {}}
+    if not os.path.exists(state_path):
+        return empty
+    with open(state_path, "r") as f:
+        state = json.load(f)
+    if state.get("version") != COMPRESS_STATE_VERSION:
+        return empty
+    if state.get("settings") != settings:
+        empty["files"] = {path: {} for path in state["files"]}
+        return empty
+    return state
+
+
+def save_compress_state(state: dict, state_path: str):
+    directory = os.path.dirname(state_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{state_path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(temp_path, state_path)
+
+
+def output_files(dest_path) -> list[str]:
+    return sorted(
+        path
+        for path, _ in collect_files(dest_path, dest_path)
+        if not path.endswith(COMPRESSED_SUFFIXES) and not path.endswith(".tmp")
+    )
+
+
+def compress_outputs(
+    dest_path,
+    state_path=DEFAULT_COMPRESS_STATE_PATH,
+    jobs=1,
+    min_bytes=DEFAULT_COMPRESS_MIN_BYTES,
+    max_ratio=DEFAULT_COMPRESS_MAX_RATIO,
+) -> CompressBuild:
+    encodings = compress_encodings()
+    settings = {
+        "encodings": list(encodings),
+        "min_bytes": min_bytes,
+        "max_ratio": max_ratio,
+    }
+    state = load_compress_state(state_path, settings)
+    build = CompressBuild()
+    files = {}
+    pending = []
+    for path in output_files(dest_path):
+        stat = os.stat(path)
+        if stat.st_size < min_bytes or path.lower().endswith(SKIPPED_EXTENSIONS):
+            remove_siblings(path)
+            build.skipped += 1
+            continue
+        signature = f"{stat.st_size}:{stat.st_mtime_ns}"
+        entry = state["files"].get(path, {})
+        digest = entry.get("digest")
+        if entry.get("stat") != signature:
+            digest = hash_file(path)
+        files[path] = {"stat": signature, "digest": digest}
+        written = entry.get("written")
+        if (
+            written is not None
+            and digest == entry["digest"]
+            and all(os.path.exists(path + suffix) for suffix in written)
+        ):
+            files[path]["written"] = written
+            build.reused += 1
+        else:
+            pending.append(path)
+
+    if jobs > 1 and len(pending) > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            results = list(
+                executor.map(
+                    lambda path: compress_file(path, encodings, max_ratio), pending
+                )
+            )
+    else:
+        results = [compress_file(path, encodings, max_ratio) for path in pending]
+    for path, written in zip(pending, results):
+        files[path]["written"] = written
+    build.compressed = len(pending)
+
+    for path in state["files"]:
+        if path in files or os.path.exists(path):
+            continue
+        for sibling in compressed_siblings([path]):
+            if os.path.exists(sibling):
+                remove_file(sibling, dest_path)
+    for path, entry in sorted(files.items()):
+        build.outputs.extend(path + suffix for suffix in entry["written"])
+    state["files"] = files
+    save_compress_state(state, state_path)
+    return build
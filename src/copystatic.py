@@ -1,5 +1,41 @@
 import os
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from manifest import hash_file
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+FICLONE = 0x40049409
+COPY_METHODS = ("auto", "hardlink", "copy")
+
+
+class CopyTreeError(Exception):
+    def __init__(self, errors: list[tuple[str, Exception]]):
+        self.errors = errors
+        details = "; ".join(f"{path}: {error}" for path, error in errors)
+        super().__init__(f"Failed to copy {len(errors)} file(s): {details}")
+
+
+class SyncStats:
+    def __init__(self):
+        self.files_copied = 0
+        self.files_skipped = 0
+        self.files_removed = 0
+        self.bytes_copied = 0
+        self.bytes_skipped = 0
+        self.synced = []
+
+    def __repr__(self):
+        return (
+            f"SyncStats(files_copied={self.files_copied}, "
+            f"files_skipped={self.files_skipped}, files_removed={self.files_removed}, "
+            f"bytes_copied={self.bytes_copied}, bytes_skipped={self.bytes_skipped})"
+        )
 
 
 def validate_directory_path(directory_path):
@@ -26,6 +62,182 @@ def copy_tree(source_path, destination_path):
             copy_tree(source_item, destination_item)
 
 
+def collect_files(source_path, destination_path) -> list[tuple[str, str]]:
+    validate_directory_path(source_path)
+
+    files = []
+    dir_list = os.listdir(source_path)
+    for item in dir_list:
+        source_item = os.path.join(source_path, item)
+        destination_item = os.path.join(destination_path, item)
+        if os.path.isfile(source_item):
+            files.append((source_item, destination_item))
+        elif os.path.isdir(source_item):
+            files.extend(collect_files(source_item, destination_item))
+    return files
+
+
+def remove_file(file_path, root_path):
+    if os.path.exists(file_path):
+        os.remove(file_path)
+    parent = os.path.dirname(file_path)
+    root = os.path.abspath(root_path)
+    while (
+        os.path.abspath(parent).startswith(root + os.sep)
+        and os.path.isdir(parent)
+        and not os.listdir(parent)
+    ):
+        os.rmdir(parent)
+        parent = os.path.dirname(parent)
+
+
+def files_match(source_path, destination_path, use_hash=False) -> bool:
+    try:
+        destination_stat = os.stat(destination_path)
+    except FileNotFoundError:
+        return False
+    source_stat = os.stat(source_path)
+    if source_stat.st_size != destination_stat.st_size:
+        return False
+    if source_stat.st_mtime_ns == destination_stat.st_mtime_ns:
+        return True
+    return use_hash and hash_file(source_path) == hash_file(destination_path)
+
+
+def clone_file(source_fd, destination_fd) -> bool:
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(destination_fd, FICLONE, source_fd)
+    except OSError:
+        return False
+    return True
+
+
+def copy_file_range(source_fd, destination_fd, size) -> bool:
+    if not hasattr(os, "copy_file_range"):
+        return False
+    copied = 0
+    try:
+        while copied < size:
+            count = os.copy_file_range(source_fd, destination_fd, size - copied)
+            if count == 0:
+                break
+            copied += count
+    except OSError:
+        return False
+    return copied == size
+
+
+def copy_file(source_path, destination_path, method="auto") -> str:
+    if method not in COPY_METHODS:
+        raise ValueError(f"Unknown copy method: {method}")
+    if os.path.lexists(destination_path):
+        os.remove(destination_path)
+    os.makedirs(os.path.dirname(destination_path) or ".", exist_ok=True)
+    if method == "hardlink":
+        try:
+            os.link(source_path, destination_path)
+            return "hardlink"
+        except OSError:
+            pass
+    used = "copy"
+    if method != "copy":
+        with open(source_path, "rb") as source, open(destination_path, "wb") as dest:
+            if clone_file(source.fileno(), dest.fileno()):
+                used = "reflink"
+            elif copy_file_range(
+                source.fileno(), dest.fileno(), os.fstat(source.fileno()).st_size
+            ):
+                used = "copy_file_range"
+    if used == "copy":
+        shutil.copyfile(source_path, destination_path)
+    shutil.copystat(source_path, destination_path)
+    return used
+
+
+def sync_file(source_path, destination_path, method="auto", use_hash=False):
+    size = os.path.getsize(source_path)
+    if files_match(source_path, destination_path, use_hash):
+        return size, False
+    copy_file(source_path, destination_path, method)
+    return size, True
+
+
+def sync_files_threaded(files, method="auto", use_hash=False, workers=8):
+    for directory in sorted({os.path.dirname(item) for _, item in files}):
+        os.makedirs(directory, exist_ok=True)
+
+    errors = []
+    results = [None] * len(files)
+    slots = threading.BoundedSemaphore(workers * 4)
+
+    def sync_one(index, source_item, destination_item):
+        try:
+            results[index] = sync_file(source_item, destination_item, method, use_hash)
+        except Exception as e:
+            errors.append((source_item, e))
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for index, (source_item, destination_item) in enumerate(files):
+            slots.acquire()
+            try:
+                executor.submit(sync_one, index, source_item, destination_item)
+            except BaseException:
+                slots.release()
+                raise
+    if errors:
+        raise CopyTreeError(sorted(errors, key=lambda error: error[0]))
+    return results
+
+
+def sync_tree(
+    source_path,
+    destination_path,
+    previous=(),
+    method="auto",
+    use_hash=False,
+    workers=1,
+) -> SyncStats:
+    stats = SyncStats()
+    files = collect_files(source_path, destination_path)
+    if workers > 1:
+        results = sync_files_threaded(files, method, use_hash, workers)
+    else:
+        results = [sync_file(*pair, method, use_hash) for pair in files]
+
+    for (_, destination_item), (size, copied) in zip(files, results):
+        if copied:
+            stats.files_copied += 1
+            stats.bytes_copied += size
+        else:
+            stats.files_skipped += 1
+            stats.bytes_skipped += size
+        stats.synced.append(destination_item)
+
+    synced = set(stats.synced)
+    for destination_item in previous:
+        if destination_item not in synced and os.path.lexists(destination_item):
+            remove_file(destination_item, destination_path)
+            stats.files_removed += 1
+    return stats
+
+
+def prune_tree(root_path, keep) -> list[str]:
+    keep = {os.path.normpath(path) for path in keep}
+    removed = []
+    for directory, _, names in os.walk(root_path):
+        for name in names:
+            path = os.path.join(directory, name)
+            if os.path.normpath(path) not in keep:
+                removed.append(path)
+    for path in removed:
+        remove_file(path, root_path)
+    return removed
+
+
 def remove_directory(directory_path):
     if os.path.exists(directory_path):
         shutil.rmtree(directory_path)
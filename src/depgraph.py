@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+
+from linkcheck import LINK_TEXT_TYPES
+from manifest import hash_file
+from pagetext import PageStore, PageText
+
+BASEPATH_INPUT = "basepath"
+ASSETS_INPUT = "assets"
+ASSET_INPUT_PREFIX = "asset:"
+
+
+class DependencyGraph:
+    def __init__(self, edges: dict[str, dict[str, str]] | None = None):
+        self.edges = edges if edges is not None else {}
+
+    def add(self, output: str, inputs: dict[str, str]):
+        self.edges[output] = dict(inputs)
+
+    def remove(self, output: str):
+        self.edges.pop(output, None)
+
+    def inputs(self, output: str) -> dict[str, str]:
+        return self.edges.get(output, {})
+
+    def asset_urls(self, output: str) -> list[str]:
+        return [
+            name[len(ASSET_INPUT_PREFIX) :]
+            for name in self.inputs(output)
+            if name.startswith(ASSET_INPUT_PREFIX)
+        ]
+
+    def dependents(self, input_name: str) -> list[str]:
+        return sorted(
+            output for output, inputs in self.edges.items() if input_name in inputs
+        )
+
+    def explain(self, output: str, inputs: dict[str, str]) -> list[str]:
+        previous = self.edges.get(output)
+        if previous is None:
+            return ["no previous build recorded"]
+        reasons = []
+        for name, fingerprint in inputs.items():
+            if name not in previous:
+                reasons.append(f"new dependency {name}")
+            elif previous[name] != fingerprint:
+                reasons.append(f"{name} changed")
+        for name in previous:
+            if name not in inputs:
+                reasons.append(f"no longer depends on {name}")
+        if not reasons and not os.path.exists(output):
+            reasons.append("output is missing")
+        return reasons
+
+    def to_dict(self) -> dict:
+        return self.edges
+
+    @classmethod
+    def from_dict(cls, edges: dict) -> "DependencyGraph":
+        return cls({output: dict(inputs) for output, inputs in edges.items()})
+
+    def __len__(self):
+        return len(self.edges)
+
+    def __repr__(self):
+        return f"DependencyGraph(outputs={len(self.edges)})"
+
+
+def page_inputs(
+    source, template_path, template_hash, basepath, assets_hash=None
+) -> dict[str, str]:
+    inputs = {
+        source: hash_file(source),
+        template_path: template_hash,
+        BASEPATH_INPUT: basepath,
+    }
+    if assets_hash is not None:
+        inputs[ASSETS_INPUT] = assets_hash
+    return inputs
+
+
+def static_inputs(source: str) -> dict[str, str]:
+    stat = os.stat(source)
+    return {source: f"{stat.st_size}:{stat.st_mtime_ns}"}
+
+
+def assets_fingerprint(assets) -> str:
+    encoded = json.dumps(assets, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def local_urls(urls) -> list[str]:
+    return sorted(
+        {
+            url.split("#", 1)[0].split("?", 1)[0]
+            for url in urls
+            if url.startswith("/") and not url.startswith("//")
+        }
+    )
+
+
+def asset_inputs(urls, images=None, assets=None) -> dict[str, str]:
+    return {
+        ASSET_INPUT_PREFIX
+        + url: assets_fingerprint(
+            [
+                images.get(url) if images else None,
+                assets.get(url) if assets else None,
+            ]
+        )
+        for url in urls
+    }
+
+
+class PageReferences(PageStore):
+    description = "the asset references"
+
+    @classmethod
+    def entry(cls, output_path: str, page_text: PageText) -> dict:
+        return {
+            "output": output_path,
+            "urls": local_urls(
+                text_node.url
+                for text_node in page_text.text_nodes
+                if text_node.text_type in LINK_TEXT_TYPES
+            ),
+        }
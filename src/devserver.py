@@ -0,0 +1,153 @@
+import functools
+import http.server
+import logging
+import os
+import threading
+import time
+
+from copystatic import prune_tree, remove_file, sync_file, sync_tree
+from generate_page import collect_pages, generate_page, generate_pages
+from template import Template
+
+logger = logging.getLogger(__name__)
+
+
+def scan_files(path, suffix="") -> dict[str, tuple[int, int]]:
+    files = {}
+    if os.path.isfile(path):
+        stat = os.stat(path)
+        files[path] = (stat.st_mtime_ns, stat.st_size)
+        return files
+    if not os.path.isdir(path):
+        return files
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                files.update(scan_files(entry.path, suffix))
+            elif entry.is_file() and entry.name.endswith(suffix):
+                stat = entry.stat()
+                files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+class SiteWatcher:
+    def __init__(
+        self, static_path, content_path, template_path, dest_path, basepath="/"
+    ):
+        self.static_path = os.path.normpath(static_path)
+        self.content_path = os.path.normpath(content_path)
+        self.template_path = os.path.normpath(template_path)
+        self.dest_path = os.path.normpath(dest_path)
+        self.basepath = basepath
+        self.template = Template.from_file(self.template_path, basepath)
+        self.snapshot = self.scan()
+
+    def scan(self) -> dict[str, tuple[int, int]]:
+        files = scan_files(self.static_path)
+        files.update(scan_files(self.content_path, ".md"))
+        files.update(scan_files(self.template_path))
+        return files
+
+    def poll(self) -> list[str]:
+        current = self.scan()
+        changed = sorted(
+            path
+            for path in current.keys() | self.snapshot.keys()
+            if current.get(path) != self.snapshot.get(path)
+        )
+        self.snapshot = current
+        template_changed = self.template_path in changed
+        if template_changed:
+            self.rebuild_pages()
+        for path in changed:
+            if path == self.template_path:
+                continue
+            if template_changed and self.is_page(path) and path in current:
+                continue
+            self.update(path, path in current)
+        return changed
+
+    def is_page(self, path) -> bool:
+        return path.startswith(self.content_path + os.sep)
+
+    def output_path(self, path, root) -> str:
+        return os.path.join(self.dest_path, os.path.relpath(path, root))
+
+    def update(self, path, exists):
+        if self.is_page(path):
+            dest_dir = os.path.dirname(self.output_path(path, self.content_path))
+            if not exists:
+                remove_file(os.path.join(dest_dir, "index.html"), self.dest_path)
+                return
+            try:
+                generate_page(
+                    path, self.template_path, dest_dir, self.basepath, self.template
+                )
+            except Exception as e:
+                logger.error("Failed to generate page from %s: %s", path, e)
+        elif path.startswith(self.static_path + os.sep):
+            destination = self.output_path(path, self.static_path)
+            if not exists:
+                remove_file(destination, self.dest_path)
+                return
+            _, copied = sync_file(path, destination)
+            if copied:
+                logger.info("Copied %s to %s", path, destination)
+
+    def rebuild_pages(self):
+        try:
+            self.template = Template.from_file(self.template_path, self.basepath)
+        except OSError as e:
+            logger.error("Failed to load template %s: %s", self.template_path, e)
+            return
+        pages = collect_pages(self.content_path, self.dest_path)
+        failures, _ = generate_pages(
+            pages, self.template_path, self.basepath, template=self.template
+        )
+        for from_path, error in failures:
+            logger.error("Failed to generate page from %s: %s", from_path, error)
+
+    def watch(self, interval=0.1):
+        while True:
+            time.sleep(interval)
+            self.poll()
+
+
+def start_server(directory, port) -> http.server.ThreadingHTTPServer:
+    handler = functools.partial(
+        http.server.SimpleHTTPRequestHandler, directory=directory
+    )
+    server = http.server.ThreadingHTTPServer(("", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def serve(
+    static_path,
+    content_path,
+    template_path,
+    dest_path,
+    port=8888,
+    watch=False,
+    interval=0.1,
+):
+    stats = sync_tree(static_path, dest_path)
+    watcher = SiteWatcher(static_path, content_path, template_path, dest_path)
+    watcher.rebuild_pages()
+    outputs = stats.synced + [
+        os.path.join(page_dest_path, "index.html")
+        for _, page_dest_path in collect_pages(content_path, dest_path)
+    ]
+    prune_tree(dest_path, outputs)
+    server = start_server(dest_path, port)
+    logger.info("Serving %s at http://localhost:%s/", dest_path, port)
+    try:
+        if watch:
+            watcher.watch(interval)
+        else:
+            threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
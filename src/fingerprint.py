@@ -0,0 +1,79 @@
+import json
+import os
+
+from copystatic import collect_files, remove_file, sync_file
+from manifest import file_digest, hashed_name
+from output import write_if_changed
+
+FINGERPRINT_STATE_VERSION = 1
+DEFAULT_FINGERPRINT_STATE_PATH = ".build/assets.json"
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+
+
+class FingerprintBuild:
+    def __init__(self, manifest_path: str):
+        self.assets = {}
+        self.outputs = []
+        self.hashed = 0
+        self.reused = 0
+        self.manifest_path = manifest_path
+
+    def __repr__(self):
+        return (
+            f"FingerprintBuild(assets={len(self.assets)}, hashed={self.hashed}, "
+            f"reused={self.reused})"
+        )
+
+
+def load_fingerprint_state(state_path: str) -> dict:
+    if not os.path.exists(state_path):
+        return {"version": FINGERPRINT_STATE_VERSION, "files": {}, "outputs": []}
+    with open(state_path, "r") as f:
+        state = json.load(f)
+    if state.get("version") != FINGERPRINT_STATE_VERSION:
+        return {"version": FINGERPRINT_STATE_VERSION, "files": {}, "outputs": []}
+    return state
+
+
+def save_fingerprint_state(state: dict, state_path: str):
+    directory = os.path.dirname(state_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{state_path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(temp_path, state_path)
+
+
+def fingerprint_assets(
+    static_path,
+    dest_path,
+    state_path=DEFAULT_FINGERPRINT_STATE_PATH,
+    method="auto",
+) -> FingerprintBuild:
+    state = load_fingerprint_state(state_path)
+    build = FingerprintBuild(os.path.join(dest_path, ASSET_MANIFEST_NAME))
+    files = {}
+    for source, destination in sorted(collect_files(static_path, dest_path)):
+        files[source], reused = file_digest(source, state["files"])
+        if reused:
+            build.reused += 1
+        else:
+            build.hashed += 1
+        url = "/" + os.path.relpath(destination, dest_path).replace(os.sep, "/")
+        build.assets[url] = hashed_name(url, files[source]["digest"])
+        output = os.path.join(dest_path, *build.assets[url][1:].split("/"))
+        sync_file(source, output, method)
+        build.outputs.append(output)
+
+    outputs = set(build.outputs)
+    for output in state["outputs"]:
+        if output not in outputs:
+            remove_file(output, dest_path)
+    write_if_changed(
+        build.manifest_path, json.dumps(build.assets, indent=2, sort_keys=True) + "\n"
+    )
+    state["files"] = files
+    state["outputs"] = build.outputs
+    save_fingerprint_state(state, state_path)
+    return build
@@ -1,7 +1,18 @@
+import logging
 import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
 from copystatic import validate_directory_path
-from markdown_blocks import markdown_to_html_node
+from markdown_blocks import PageMetadata, parse_markdown, read_markdown_blocks
+from output import OutputFile, write_if_changed
+from parse_cache import shared_parse_cache
+from pagetext import PageText
+from template import Template
+
+MISSING_TITLE_MESSAGE = "No title found in the markdown content."
+
+logger = logging.getLogger(__name__)
 
 
 def extract_title(markdown):
@@ -12,42 +23,234 @@ def extract_title(markdown):
             title = line[2:].strip()
             break
     if title is None:
-        raise ValueError("No title found in the markdown content.")
+        raise ValueError(MISSING_TITLE_MESSAGE)
     return title
 
 
-def generate_page(from_path, template_path, dest_path, basepath="/"):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    with open(from_path, "r") as f:
-        markdown = f.read()
-    with open(template_path, "r") as f:
-        template = f.read()
-    content = markdown_to_html_node(markdown).to_html()
-    title = extract_title(markdown)
-    template = template.replace("{{ Title }}", title)
-    template = template.replace("{{ Content }}", content)
-    template = template.replace('href="/', f'href="{basepath}')
-    template = template.replace('src="/', f'src="{basepath}')
+def page_title(metadata: PageMetadata) -> str:
+    if metadata.title is None:
+        raise ValueError(MISSING_TITLE_MESSAGE)
+    return metadata.title
+
+
+def generate_page(
+    from_path,
+    template_path,
+    dest_path,
+    basepath="/",
+    template=None,
+    cache=None,
+    page_text=None,
+    images=None,
+    mmap_threshold=None,
+):
+    logger.info(
+        "Generating page from %s to %s using %s", from_path, dest_path, template_path
+    )
+    if template is None:
+        template = Template.from_file(template_path, basepath)
+    sink = page_text.text_nodes if page_text is not None else None
+    content, metadata = parse_markdown(
+        read_markdown_blocks(from_path, mmap_threshold), cache, sink, images
+    )
+    title = page_title(metadata)
+    if page_text is not None:
+        page_text.title = title
 
     if not os.path.exists(dest_path):
         os.makedirs(dest_path, exist_ok=True)
-    with open(os.path.join(dest_path, "index.html"), "w") as f:
-        f.write(template)
+    with OutputFile(os.path.join(dest_path, "index.html")) as out:
+        template.write(out, {"Title": title, "Content": content})
+    return out.changed
 
 
-def generate_pages_recursively(
-    dir_path_content, template_path, dest_dir_path, basepath="/"
-):
+def render_page(markdown, template, cache=None, page_text=None, images=None) -> str:
+    sink = page_text.text_nodes if page_text is not None else None
+    content, metadata = parse_markdown(markdown, cache, sink, images)
+    title = page_title(metadata)
+    if page_text is not None:
+        page_text.title = title
+    return template.render({"Title": title, "Content": content})
+
+
+def write_page(dest_path, html) -> bool:
+    if not os.path.exists(dest_path):
+        os.makedirs(dest_path, exist_ok=True)
+    return write_if_changed(os.path.join(dest_path, "index.html"), html)
+
+
+def collect_pages(dir_path_content, dest_dir_path) -> list[tuple[str, str]]:
     validate_directory_path(dir_path_content)
 
+    pages = []
     dir_list = os.listdir(dir_path_content)
     for item in dir_list:
         source_item = os.path.join(dir_path_content, item)
         destination_item = os.path.join(dest_dir_path, item)
         if os.path.isfile(source_item):
             if source_item.endswith(".md"):
-                generate_page(source_item, template_path, dest_dir_path, basepath)
+                pages.append((source_item, dest_dir_path))
+        elif os.path.isdir(source_item):
+            pages.extend(collect_pages(source_item, destination_item))
+    return pages
+
+
+def _generate_page_safely(
+    page,
+    template_path,
+    basepath,
+    template,
+    cache_path,
+    store_types,
+    images,
+    mmap_threshold,
+):
+    from_path, dest_path = page
+    cache = shared_parse_cache(cache_path) if cache_path else None
+    page_text = PageText() if store_types else None
+    try:
+        changed = generate_page(
+            from_path,
+            template_path,
+            dest_path,
+            basepath,
+            template,
+            cache,
+            page_text,
+            images,
+            mmap_threshold,
+        )
+    except Exception as e:
+        return (from_path, f"{type(e).__name__}: {e}"), False, None
+    finally:
+        if cache is not None:
+            cache.flush()
+    output_path = os.path.join(dest_path, "index.html")
+    entries = [store_type.entry(output_path, page_text) for store_type in store_types]
+    return None, changed, entries
+
+
+def generate_pages(
+    pages,
+    template_path,
+    basepath="/",
+    jobs=1,
+    cache_path=None,
+    collectors=(),
+    images=None,
+    assets=None,
+    mmap_threshold=None,
+    template=None,
+) -> tuple[list[tuple[str, str]], list[str]]:
+    pages = sorted(pages)
+    if template is None:
+        template = Template.from_file(template_path, basepath, assets)
+    store_types = tuple(type(collector) for collector in collectors)
+    if jobs == 1:
+        results = [
+            _generate_page_safely(
+                page,
+                template_path,
+                basepath,
+                template,
+                cache_path,
+                store_types,
+                images,
+                mmap_threshold,
+            )
+            for page in pages
+        ]
+    else:
+        workers = jobs or os.cpu_count() or 1
+        chunksize = max(1, len(pages) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(
+                executor.map(
+                    _generate_page_safely,
+                    pages,
+                    repeat(template_path),
+                    repeat(basepath),
+                    repeat(template),
+                    repeat(cache_path),
+                    repeat(store_types),
+                    repeat(images),
+                    repeat(mmap_threshold),
+                    chunksize=chunksize,
+                )
+            )
+    failures = [failure for failure, _, _ in results if failure is not None]
+    changed = [
+        os.path.join(dest_path, "index.html")
+        for (_, dest_path), (_, page_changed, _) in zip(pages, results)
+        if page_changed
+    ]
+    for (from_path, _), (_, _, entries) in zip(pages, results):
+        for index, collector in enumerate(collectors):
+            if entries is None:
+                collector.remove(from_path)
+            else:
+                collector.pages[from_path] = entries[index]
+    return failures, changed
+
+
+def generate_pages_recursively(
+    dir_path_content,
+    template_path,
+    dest_dir_path,
+    basepath="/",
+    template=None,
+    shard=None,
+    content_root=None,
+    collectors=(),
+    images=None,
+    assets=None,
+    mmap_threshold=None,
+) -> list[str]:
+    validate_directory_path(dir_path_content)
+    if template is None:
+        template = Template.from_file(template_path, basepath, assets)
+    if content_root is None:
+        content_root = dir_path_content
+
+    changed = []
+    dir_list = os.listdir(dir_path_content)
+    for item in dir_list:
+        source_item = os.path.join(dir_path_content, item)
+        destination_item = os.path.join(dest_dir_path, item)
+        if os.path.isfile(source_item):
+            if not source_item.endswith(".md"):
+                continue
+            if shard and not shard.owns(os.path.relpath(source_item, content_root)):
+                continue
+            output_path = os.path.join(dest_dir_path, "index.html")
+            page_text = PageText() if collectors else None
+            if generate_page(
+                source_item,
+                template_path,
+                dest_dir_path,
+                basepath,
+                template,
+                page_text=page_text,
+                images=images,
+                mmap_threshold=mmap_threshold,
+            ):
+                changed.append(output_path)
+            for collector in collectors:
+                collector.add(source_item, output_path, page_text)
         elif os.path.isdir(source_item):
-            generate_pages_recursively(
-                source_item, template_path, destination_item, basepath
+            changed.extend(
+                generate_pages_recursively(
+                    source_item,
+                    template_path,
+                    destination_item,
+                    basepath,
+                    template,
+                    shard,
+                    content_root,
+                    collectors,
+                    images,
+                    assets,
+                    mmap_threshold,
+                )
             )
+    return changed
@@ -1,4 +1,9 @@
+import io
+
+
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(
         self,
         tag: str | None = None,
@@ -14,6 +19,9 @@ class HTMLNode:
     def to_html(self):
         raise NotImplementedError("Subclasses should implement this method")
 
+    def write_html(self, out):
+        raise NotImplementedError("Subclasses should implement this method")
+
     def props_to_html(self):
         if not self.props:
             return ""
@@ -24,6 +32,8 @@ class HTMLNode:
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(
         self,
         value: str,
@@ -39,11 +49,16 @@ class LeafNode(HTMLNode):
             return self.value
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
 
+    def write_html(self, out):
+        out.write(self.to_html())
+
     def __repr__(self):
         return f"LeafNode(tag={self.tag}, value={self.value}, props={self.props})"
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(
         self,
         tag: str,
@@ -53,12 +68,19 @@ class ParentNode(HTMLNode):
         super().__init__(tag, None, children, props)
 
     def to_html(self):
+        buffer = io.StringIO()
+        self.write_html(buffer)
+        return buffer.getvalue()
+
+    def write_html(self, out):
         if not self.tag:
             raise ValueError("All parent nodes must have a tag.")
         if not self.children:
             raise ValueError("All parent nodes must have children.")
-        children_html = "".join(child.to_html() for child in self.children)
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+        out.write(f"<{self.tag}{self.props_to_html()}>")
+        for child in self.children:
+            child.write_html(out)
+        out.write(f"</{self.tag}>")
 
     def __repr__(self):
         return (
@@ -0,0 +1,252 @@
+import json
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+from copystatic import collect_files, remove_file, sync_file
+from manifest import file_digest, hashed_name
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+IMAGE_CACHE_VERSION = 2
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+DEFAULT_IMAGE_WIDTHS = (480, 960, 1600)
+DEFAULT_IMAGE_CACHE_PATH = ".build/images"
+JPEG_SOF_MARKERS = {
+    0xC0,
+    0xC1,
+    0xC2,
+    0xC3,
+    0xC5,
+    0xC6,
+    0xC7,
+    0xC9,
+    0xCA,
+    0xCB,
+    0xCD,
+    0xCE,
+    0xCF,
+}
+
+
+class ImageBuild:
+    def __init__(self):
+        self.assets = {}
+        self.outputs = []
+        self.processed = 0
+        self.reused = 0
+
+    def __repr__(self):
+        return (
+            f"ImageBuild(images={len(self.assets)}, outputs={len(self.outputs)}, "
+            f"processed={self.processed}, reused={self.reused})"
+        )
+
+
+def jpeg_size(f) -> tuple[int, int] | None:
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte == b"\xff":
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            continue
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        (length,) = struct.unpack(">H", length_bytes)
+        if marker in JPEG_SOF_MARKERS:
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            height, width = struct.unpack(">xHH", data)
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def webp_size(header: bytes) -> tuple[int, int] | None:
+    chunk = header[12:16]
+    if chunk == b"VP8 " and len(header) >= 30:
+        width, height = struct.unpack("<HH", header[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and len(header) >= 25:
+        b0, b1, b2, b3 = header[21:25]
+        width = 1 + (((b1 & 0x3F) << 8) | b0)
+        height = 1 + (((b3 & 0x0F) << 10) | (b2 << 2) | ((b1 & 0xC0) >> 6))
+        return width, height
+    if chunk == b"VP8X" and len(header) >= 30:
+        width = 1 + int.from_bytes(header[24:27], "little")
+        height = 1 + int.from_bytes(header[27:30], "little")
+        return width, height
+    return None
+
+
+def image_size(path: str) -> tuple[int, int] | None:
+    with open(path, "rb") as f:
+        header = f.read(32)
+        if header.startswith(b"\x89PNG\r\n\x1a\n") and header[12:16] == b"IHDR":
+            return struct.unpack(">II", header[16:24])
+        if header[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", header[6:10])
+        if header.startswith(b"RIFF") and header[8:12] == b"WEBP":
+            return webp_size(header)
+        if header.startswith(b"\xff\xd8"):
+            return jpeg_size(f)
+    return None
+
+
+def variant_height(size: tuple[int, int], width: int) -> int:
+    return max(1, round(size[1] * width / size[0]))
+
+
+def resize_image(source_path: str, destination_path: str, width: int, height: int):
+    temp_path = f"{destination_path}.{os.getpid()}.tmp"
+    with Image.open(source_path) as image:
+        resized = image.resize((width, height), Image.LANCZOS)
+        resized.save(temp_path, format=image.format)
+    os.replace(temp_path, destination_path)
+
+
+def process_image(source_path, digest, widths, cache_path) -> dict:
+    size = image_size(source_path)
+    record = {
+        "size": size,
+        "widths": list(widths),
+        "resized": Image is not None,
+        "variants": [],
+    }
+    if size is None or Image is None:
+        return record
+    extension = os.path.splitext(source_path)[1].lower()
+    for width in sorted(widths):
+        if width >= size[0]:
+            continue
+        height = variant_height(size, width)
+        cached = os.path.join(cache_path, f"{digest}-{width}w{extension}")
+        if not os.path.exists(cached):
+            resize_image(source_path, cached, width, height)
+        record["variants"].append([width, height, cached])
+    return record
+
+
+def load_image_cache(cache_path: str) -> dict:
+    index_path = os.path.join(cache_path, "index.json")
+    if not os.path.exists(index_path):
+        return {
+            "version": IMAGE_CACHE_VERSION,
+            "images": {},
+            "sources": {},
+            "outputs": [],
+        }
+    with open(index_path, "r") as f:
+        cache = json.load(f)
+    if cache.get("version") != IMAGE_CACHE_VERSION:
+        return {
+            "version": IMAGE_CACHE_VERSION,
+            "images": {},
+            "sources": {},
+            "outputs": [],
+        }
+    return cache
+
+
+def save_image_cache(cache: dict, cache_path: str):
+    index_path = os.path.join(cache_path, "index.json")
+    temp_path = f"{index_path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(temp_path, index_path)
+
+
+def image_asset(url: str, digest: str, record: dict) -> tuple[dict, list]:
+    src = hashed_name(url, digest)
+    asset = {"src": src}
+    files = []
+    if record["size"] is None:
+        return asset, files
+    width, height = record["size"]
+    asset["width"] = width
+    asset["height"] = height
+    candidates = []
+    for variant_width, _, cached in record["variants"]:
+        variant_url = hashed_name(url, digest, f"-{variant_width}w")
+        candidates.append(f"{variant_url} {variant_width}w")
+        files.append((cached, variant_url))
+    if candidates:
+        candidates.append(f"{src} {width}w")
+        asset["srcset"] = ", ".join(candidates)
+    return asset, files
+
+
+def process_images(
+    static_path,
+    dest_path,
+    cache_path=DEFAULT_IMAGE_CACHE_PATH,
+    widths=DEFAULT_IMAGE_WIDTHS,
+    jobs=1,
+) -> ImageBuild:
+    os.makedirs(cache_path, exist_ok=True)
+    cache = load_image_cache(cache_path)
+    build = ImageBuild()
+    sources = {}
+    images = []
+    for source, destination in collect_files(static_path, dest_path):
+        if not source.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        sources[source], _ = file_digest(source, cache["sources"])
+        images.append((source, destination, sources[source]["digest"]))
+
+    pending = {}
+    for source, _, digest in images:
+        record = cache["images"].get(digest)
+        if (
+            record is None
+            or record["widths"] != list(widths)
+            or (Image is not None and not record["resized"])
+        ):
+            pending.setdefault(digest, source)
+    arguments = (
+        list(pending.values()),
+        list(pending),
+        [widths] * len(pending),
+        [cache_path] * len(pending),
+    )
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            records = list(executor.map(process_image, *arguments))
+    else:
+        records = list(map(process_image, *arguments))
+    cache["images"].update(zip(pending, records))
+    build.processed = len(pending)
+    build.reused = len(images) - len(pending)
+
+    for source, destination, digest in images:
+        url = "/" + os.path.relpath(destination, dest_path).replace(os.sep, "/")
+        asset, files = image_asset(url, digest, cache["images"][digest])
+        build.assets[url] = asset
+        for file_source, file_url in [(source, asset["src"])] + files:
+            output = os.path.join(dest_path, *file_url[1:].split("/"))
+            sync_file(file_source, output)
+            build.outputs.append(output)
+
+    used = {digest for _, _, digest in images}
+    for digest in list(cache["images"]):
+        if digest in used:
+            continue
+        for _, _, cached in cache["images"].pop(digest)["variants"]:
+            if os.path.exists(cached):
+                os.remove(cached)
+    outputs = set(build.outputs)
+    for output in cache["outputs"]:
+        if output not in outputs:
+            remove_file(output, dest_path)
+    cache["outputs"] = build.outputs
+    cache["sources"] = sources
+    save_image_cache(cache, cache_path)
+    return build
@@ -0,0 +1,243 @@
+import os
+
+from copystatic import remove_file, sync_tree
+from depgraph import (
+    ASSET_INPUT_PREFIX,
+    DependencyGraph,
+    PageReferences,
+    asset_inputs,
+    assets_fingerprint,
+    local_urls,
+    page_inputs,
+    static_inputs,
+)
+from generate_page import collect_pages, generate_pages
+from manifest import (
+    DEFAULT_MANIFEST_PATH,
+    empty_manifest,
+    hash_file,
+    load_manifest,
+    save_manifest,
+)
+from pipeline import generate_pages_pipelined
+from template import referenced_urls
+
+
+class BuildSummary:
+    def __init__(self):
+        self.pages_rendered = 0
+        self.pages_skipped = 0
+        self.pages_removed = 0
+        self.static_copied = 0
+        self.static_skipped = 0
+        self.static_removed = 0
+        self.static_bytes_copied = 0
+        self.static_bytes_skipped = 0
+        self.failures = []
+        self.pages_changed = []
+        self.outputs = []
+        self.reasons = {}
+
+    def __repr__(self):
+        return (
+            f"BuildSummary(pages_rendered={self.pages_rendered}, "
+            f"pages_skipped={self.pages_skipped}, pages_removed={self.pages_removed}, "
+            f"static_copied={self.static_copied}, static_skipped={self.static_skipped}, "
+            f"static_removed={self.static_removed}, failures={self.failures})"
+        )
+
+
+def sync_changed_static(
+    static_path,
+    dest_path,
+    previous,
+    current,
+    graph,
+    summary,
+    method,
+    use_hash,
+    workers=1,
+):
+    stats = sync_tree(
+        static_path,
+        dest_path,
+        [entry["output"] for entry in previous.values()],
+        method,
+        use_hash,
+        workers,
+    )
+    for destination in stats.synced:
+        source = os.path.join(static_path, os.path.relpath(destination, dest_path))
+        current[source] = {"output": destination}
+        graph.add(destination, static_inputs(source))
+    summary.static_copied = stats.files_copied
+    summary.static_skipped = stats.files_skipped
+    summary.static_removed = stats.files_removed
+    summary.static_bytes_copied = stats.bytes_copied
+    summary.static_bytes_skipped = stats.bytes_skipped
+
+
+def render_changed_pages(
+    content_path,
+    template_path,
+    dest_path,
+    basepath,
+    previous_graph,
+    current,
+    graph,
+    summary,
+    jobs,
+    cache_path,
+    collectors=(),
+    images=None,
+    assets=None,
+    mmap_threshold=None,
+    pipeline=False,
+):
+    template_hash = hash_file(template_path)
+    tracked = images is not None or assets is not None
+    assets_hash = None
+    template_refs = []
+    if tracked:
+        assets_hash = assets_fingerprint([images is not None, assets is not None])
+        with open(template_path, "r") as f:
+            template_refs = referenced_urls(f.read())
+    references = PageReferences()
+    pending = []
+    for source, dest_dir in collect_pages(content_path, dest_path):
+        output = os.path.join(dest_dir, "index.html")
+        inputs = page_inputs(
+            source, template_path, template_hash, basepath, assets_hash
+        )
+        if tracked:
+            inputs.update(
+                asset_inputs(previous_graph.asset_urls(output), images, assets)
+            )
+        current[source] = {"output": output}
+        graph.add(output, inputs)
+        reasons = previous_graph.explain(output, inputs)
+        if not reasons:
+            reasons = [
+                f"missing from {collector.description}"
+                for collector in collectors
+                if source not in collector.pages
+            ]
+        if not reasons:
+            summary.pages_skipped += 1
+            continue
+        summary.reasons[output] = reasons
+        pending.append((source, dest_dir))
+
+    page_collectors = list(collectors) + [references] if tracked else collectors
+    if pipeline:
+        summary.failures, summary.pages_changed = generate_pages_pipelined(
+            pending,
+            template_path,
+            basepath,
+            cache_path=cache_path,
+            collectors=page_collectors,
+            images=images,
+            assets=assets,
+            mmap_threshold=mmap_threshold,
+        )
+    else:
+        summary.failures, summary.pages_changed = generate_pages(
+            pending,
+            template_path,
+            basepath,
+            jobs,
+            cache_path,
+            page_collectors,
+            images,
+            assets,
+            mmap_threshold,
+        )
+    for source, _ in summary.failures:
+        graph.remove(current[source]["output"])
+    for source, entry in references.pages.items():
+        output = current[source]["output"]
+        inputs = {
+            name: fingerprint
+            for name, fingerprint in graph.inputs(output).items()
+            if not name.startswith(ASSET_INPUT_PREFIX)
+        }
+        urls = local_urls(entry["urls"] + template_refs)
+        inputs.update(asset_inputs(urls, images, assets))
+        graph.add(output, inputs)
+    summary.pages_rendered = len(pending) - len(summary.failures)
+
+
+def remove_stale_outputs(previous, outputs, dest_path) -> int:
+    removed = 0
+    for entry in previous.values():
+        if entry["output"] in outputs:
+            continue
+        remove_file(entry["output"], dest_path)
+        removed += 1
+    return removed
+
+
+def build_incrementally(
+    static_path,
+    content_path,
+    template_path,
+    dest_path,
+    basepath="/",
+    manifest_path=DEFAULT_MANIFEST_PATH,
+    jobs=1,
+    cache_path=None,
+    copy_method="auto",
+    hash_static=False,
+    copy_jobs=1,
+    collectors=(),
+    images=None,
+    assets=None,
+    mmap_threshold=None,
+    pipeline=False,
+) -> BuildSummary:
+    previous = load_manifest(manifest_path)
+    current = empty_manifest()
+    previous_graph = DependencyGraph.from_dict(previous["graph"])
+    graph = DependencyGraph()
+    summary = BuildSummary()
+
+    os.makedirs(dest_path, exist_ok=True)
+    sync_changed_static(
+        static_path,
+        dest_path,
+        previous["static"],
+        current["static"],
+        graph,
+        summary,
+        copy_method,
+        hash_static,
+        copy_jobs,
+    )
+    render_changed_pages(
+        content_path,
+        template_path,
+        dest_path,
+        basepath,
+        previous_graph,
+        current["pages"],
+        graph,
+        summary,
+        jobs,
+        cache_path,
+        collectors,
+        images,
+        assets,
+        mmap_threshold,
+        pipeline,
+    )
+    for collector in collectors:
+        collector.retain(current["pages"])
+
+    outputs = {entry["output"] for entry in current["pages"].values()}
+    outputs.update(entry["output"] for entry in current["static"].values())
+    summary.pages_removed = remove_stale_outputs(previous["pages"], outputs, dest_path)
+    summary.outputs = sorted(outputs)
+
+    current["graph"] = graph.to_dict()
+    save_manifest(current, manifest_path)
+    return summary
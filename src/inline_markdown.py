@@ -2,6 +2,23 @@ import re
 
 from textnode import TextNode, TextType
 
+TEXT_CHAR = r"(?:[^`_*\n]|\*(?!\*))"
+IMAGE_PATTERN = rf"!\[{TEXT_CHAR}*?\]\({TEXT_CHAR}*?\)"
+LINK_CHAR = rf"(?:(?!{IMAGE_PATTERN}){TEXT_CHAR})"
+INLINE_PATTERN = re.compile(
+    r"`(?P<code>[^`]*)`"
+    r"|_(?P<italic>[^_`]*)_"
+    r"|\*\*(?P<bold>[^_`]*?)\*\*"
+    rf"|!\[(?P<image_alt>{TEXT_CHAR}*?)\]\((?P<image>{TEXT_CHAR}*?)\)"
+    rf"|(?<!!)\[(?P<link_text>{LINK_CHAR}*?)\]\((?P<link>{LINK_CHAR}*?)\)"
+)
+UNMATCHED_DELIMITER_PATTERN = re.compile(r"`|\*\*|_")
+DELIMITED_TEXT_TYPES = {
+    "code": TextType.CODE,
+    "bold": TextType.BOLD,
+    "italic": TextType.ITALIC,
+}
+
 
 def split_nodes_delimiter(
     old_nodes: list[TextNode], delimiter: str, text_type: TextType
@@ -73,11 +90,27 @@ def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
     return new_nodes
 
 
+def append_plain_text(nodes: list[TextNode], text: str, source: str):
+    if not text:
+        return
+    unmatched = UNMATCHED_DELIMITER_PATTERN.search(text)
+    if unmatched:
+        raise Exception(f"Unmatched delimiter '{unmatched[0]}' in: {source}")
+    nodes.append(TextNode(text, TextType.TEXT))
+
+
 def text_to_textnodes(text: str) -> list[TextNode]:
-    nodes = [TextNode(text, TextType.TEXT)]
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+    nodes = []
+    position = 0
+    for match in INLINE_PATTERN.finditer(text):
+        append_plain_text(nodes, text[position : match.start()], text)
+        position = match.end()
+        kind = match.lastgroup
+        if kind == "image":
+            nodes.append(TextNode(match["image_alt"], TextType.IMAGE, match["image"]))
+        elif kind == "link":
+            nodes.append(TextNode(match["link_text"], TextType.LINK, match["link"]))
+        elif match[kind]:
+            nodes.append(TextNode(match[kind], DELIMITED_TEXT_TYPES[kind]))
+    append_plain_text(nodes, text[position:], text)
     return nodes
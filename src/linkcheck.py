@@ -0,0 +1,58 @@
+from urllib.parse import unquote, urljoin, urlsplit
+
+from pagetext import PageStore, PageText, page_url
+from textnode import TextType
+
+DEFAULT_LINK_STORE_PATH = ".build/links.json"
+LINK_TEXT_TYPES = (TextType.LINK, TextType.IMAGE)
+
+
+def rewrite_url(url: str, basepath: str) -> str:
+    if url.startswith("/") and not url.startswith("//"):
+        return basepath + url[1:]
+    return url
+
+
+def site_path(url: str, base_url: str, basepath: str) -> str | None:
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    path = urlsplit(urljoin(base_url, rewrite_url(url, basepath))).path
+    if not path.startswith(basepath):
+        return path
+    return unquote(path[len(basepath) :])
+
+
+def target_exists(path: str, files: set[str]) -> bool:
+    if path == "" or path.endswith("/"):
+        return f"{path}index.html" in files
+    return path in files or f"{path}/index.html" in files
+
+
+class LinkIndex(PageStore):
+    description = "the link index"
+
+    @classmethod
+    def entry(cls, output_path: str, page_text: PageText) -> dict:
+        return {
+            "output": output_path,
+            "links": [
+                text_node.url
+                for text_node in page_text.text_nodes
+                if text_node.text_type in LINK_TEXT_TYPES
+            ],
+        }
+
+    def link_count(self) -> int:
+        return sum(len(entry["links"]) for entry in self.pages.values())
+
+    def check(self, files: set[str], dest_path: str, basepath="/") -> list[tuple]:
+        broken = []
+        for source in sorted(self.pages):
+            entry = self.pages[source]
+            base_url = page_url(entry["output"], dest_path, basepath)
+            for url in entry["links"]:
+                path = site_path(url, base_url, basepath)
+                if path is not None and not target_exists(path, files):
+                    broken.append((source, url))
+        return broken
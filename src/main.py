@@ -1,14 +1,653 @@
+import argparse
+import logging
+import os
 import sys
 
-from copystatic import replace_content
-from generate_page import generate_pages_recursively
+from compress import (
+    DEFAULT_COMPRESS_MAX_RATIO,
+    DEFAULT_COMPRESS_MIN_BYTES,
+    DEFAULT_COMPRESS_STATE_PATH,
+    brotli,
+    compress_outputs,
+    compressed_siblings,
+)
+from copystatic import COPY_METHODS, prune_tree, sync_tree
+from devserver import serve
+from fingerprint import DEFAULT_FINGERPRINT_STATE_PATH, fingerprint_assets
+from generate_page import collect_pages, generate_pages, generate_pages_recursively
+from images import DEFAULT_IMAGE_CACHE_PATH, DEFAULT_IMAGE_WIDTHS, process_images
+from incremental import build_incrementally
+from linkcheck import DEFAULT_LINK_STORE_PATH, LinkIndex
+from manifest import DEFAULT_MANIFEST_PATH
+from parse_cache import DEFAULT_CACHE_MAX_BYTES, DEFAULT_CACHE_PATH, ParseCache
+from pipeline import generate_pages_pipelined
+from profiling import DEFAULT_PROFILE_PATH, format_slowest_pages, profile_build
+from search import DEFAULT_SEARCH_STORE_PATH, SEARCH_INDEX_NAME, SearchIndex
+from sharding import (
+    DEFAULT_SHARD_PATH,
+    Shard,
+    ShardMergeError,
+    list_shards,
+    merge_shards,
+)
 
+STATIC_PATH = "static/"
+CONTENT_PATH = "content/"
+TEMPLATE_PATH = "template.html"
+OUTPUT_PATH = "docs/"
 
-def main():
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
-    replace_content("static/", "docs/")
-    print("Content replaced successfully.")
-    generate_pages_recursively("content/", "template.html", "docs/", basepath)
+logger = logging.getLogger(__name__)
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value}")
+    return number
+
+
+def widths_arg(value):
+    try:
+        widths = tuple(sorted({positive_int(width) for width in value.split(",")}))
+    except (ValueError, argparse.ArgumentTypeError):
+        raise argparse.ArgumentTypeError(f"expected widths like 480,960, got {value}")
+    return widths
+
+
+def shard_arg(value):
+    try:
+        return Shard.parse(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static site.")
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only rebuild pages and static files whose inputs changed",
+    )
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="print why each page was rebuilt (implies --incremental)",
+    )
+    parser.add_argument(
+        "--manifest",
+        default=DEFAULT_MANIFEST_PATH,
+        help="build manifest used by --incremental",
+    )
+    parser.add_argument(
+        "--copy-method",
+        choices=COPY_METHODS,
+        default="auto",
+        help="how changed static files are copied",
+    )
+    parser.add_argument(
+        "--copy-jobs",
+        type=positive_int,
+        default=1,
+        help="copy static files with N threads",
+    )
+    parser.add_argument(
+        "--hash-static",
+        action="store_true",
+        help="compare static files by hash when size matches but mtime differs",
+    )
+    rendering = parser.add_mutually_exclusive_group()
+    rendering.add_argument(
+        "--jobs",
+        "-j",
+        type=positive_int,
+        default=None,
+        help="render pages across N worker processes",
+    )
+    rendering.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="overlap page reads and writes with rendering",
+    )
+    parser.add_argument(
+        "--changed-list",
+        metavar="PATH",
+        help="write the paths of output pages whose bytes changed to PATH",
+    )
+    parser.add_argument(
+        "--parse-cache",
+        nargs="?",
+        const=DEFAULT_CACHE_PATH,
+        default=None,
+        metavar="PATH",
+        help="reuse rendered blocks from an on-disk cache at PATH",
+    )
+    parser.add_argument(
+        "--parse-cache-max-mb",
+        type=positive_int,
+        default=DEFAULT_CACHE_MAX_BYTES // (1024 * 1024),
+        help="evict least recently used blocks above this cache size",
+    )
+    parser.add_argument(
+        "--mmap-threshold",
+        type=positive_int,
+        metavar="BYTES",
+        help="read pages of at least BYTES through mmap instead of line by line",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=DEFAULT_PROFILE_PATH,
+        default=None,
+        metavar="PATH",
+        help="time each build stage per page and write a JSON report to PATH",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=positive_int,
+        default=10,
+        help="number of slowest pages to list in the profile report",
+    )
+    parser.add_argument(
+        "--search-index",
+        action="store_true",
+        help=f"write a search index of page text to {SEARCH_INDEX_NAME} in the output",
+    )
+    parser.add_argument(
+        "--search-store",
+        default=DEFAULT_SEARCH_STORE_PATH,
+        help="per-page search terms kept between builds",
+    )
+    parser.add_argument(
+        "--check-links",
+        action="store_true",
+        help="fail the build on links and images that point to missing pages or files",
+    )
+    parser.add_argument(
+        "--link-store",
+        default=DEFAULT_LINK_STORE_PATH,
+        help="per-page link targets kept between builds",
+    )
+    parser.add_argument(
+        "--images",
+        action="store_true",
+        help="emit content-hashed images with dimensions and resized variants",
+    )
+    parser.add_argument(
+        "--image-widths",
+        type=widths_arg,
+        default=DEFAULT_IMAGE_WIDTHS,
+        help="comma-separated widths of resized variants (requires Pillow)",
+    )
+    parser.add_argument(
+        "--image-jobs",
+        type=positive_int,
+        default=1,
+        help="resize images across N worker processes",
+    )
+    parser.add_argument(
+        "--image-cache",
+        default=DEFAULT_IMAGE_CACHE_PATH,
+        help="directory of resized variants keyed by source hash",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="copy static files under content-hashed names and rewrite references",
+    )
+    parser.add_argument(
+        "--fingerprint-state",
+        default=DEFAULT_FINGERPRINT_STATE_PATH,
+        help="static file hashes and fingerprinted outputs kept between builds",
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="write .gz (and .br when brotli is installed) siblings of outputs",
+    )
+    parser.add_argument(
+        "--compress-jobs",
+        type=positive_int,
+        help="compress across N worker threads (default: CPU count)",
+    )
+    parser.add_argument(
+        "--compress-min-bytes",
+        type=int,
+        default=DEFAULT_COMPRESS_MIN_BYTES,
+        help="leave files smaller than this uncompressed",
+    )
+    parser.add_argument(
+        "--compress-max-ratio",
+        type=float,
+        default=DEFAULT_COMPRESS_MAX_RATIO,
+        help="drop a compressed variant larger than this fraction of the original",
+    )
+    parser.add_argument(
+        "--compress-state",
+        default=DEFAULT_COMPRESS_STATE_PATH,
+        help="source hashes of compressed outputs kept between builds",
+    )
+    parser.add_argument(
+        "--shard",
+        type=shard_arg,
+        metavar="I/N",
+        help="only render the I-th of N content slices into its own directory",
+    )
+    parser.add_argument(
+        "--shard-dir",
+        default=DEFAULT_SHARD_PATH,
+        help="directory that holds one output directory per shard",
+    )
+    parser.add_argument(
+        "--quiet",
+        "-q",
+        action="store_true",
+        help="only log warnings and errors",
+    )
+    args = parser.parse_args(argv)
+    if args.shard and (args.incremental or args.explain or args.profile):
+        parser.error("--shard cannot be combined with --incremental or --profile")
+    for option, enabled in [
+        ("--incremental", args.incremental or args.explain),
+        ("--jobs", args.jobs is not None),
+        ("--pipeline", args.pipeline),
+        ("--parse-cache", args.parse_cache is not None),
+        ("--mmap-threshold", args.mmap_threshold is not None),
+    ]:
+        if enabled and args.profile:
+            parser.error(f"{option} cannot be combined with --profile")
+    for option, enabled in [
+        ("--search-index", args.search_index),
+        ("--check-links", args.check_links),
+        ("--images", args.images),
+        ("--fingerprint", args.fingerprint),
+        ("--compress", args.compress),
+    ]:
+        if enabled and (args.shard or args.profile):
+            parser.error(f"{option} cannot be combined with --shard or --profile")
+    if not 0 < args.compress_max_ratio <= 1:
+        parser.error("--compress-max-ratio must be greater than 0 and at most 1")
+    return args
+
+
+def parse_merge_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="main.py merge",
+        description="Combine shard outputs and static files into the site.",
+    )
+    parser.add_argument(
+        "shards",
+        nargs="*",
+        help="shard output directories (default: every directory in --shard-dir)",
+    )
+    parser.add_argument("--shard-dir", default=DEFAULT_SHARD_PATH)
+    parser.add_argument("--copy-method", choices=COPY_METHODS, default="auto")
+    parser.add_argument(
+        "--quiet",
+        "-q",
+        action="store_true",
+        help="only log warnings and errors",
+    )
+    return parser.parse_args(argv)
+
+
+def parse_serve_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="main.py serve", description="Build the site and serve it locally."
+    )
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="re-render changed pages and static files while serving",
+    )
+    parser.add_argument(
+        "--quiet",
+        "-q",
+        action="store_true",
+        help="only log warnings and errors",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.1,
+        help="seconds between checks for changed files",
+    )
+    return parser.parse_args(argv)
+
+
+def report_failures(failures):
+    for from_path, error in failures:
+        print(f"Failed to generate page from {from_path}: {error}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+
+def configure_logging(quiet):
+    logging.basicConfig(
+        level=logging.WARNING if quiet else logging.INFO,
+        format="%(message)s",
+        stream=sys.stdout,
+    )
+
+
+def evict_parse_cache(args):
+    if args.parse_cache is None:
+        return
+    with ParseCache(args.parse_cache) as cache:
+        cache.evict(args.parse_cache_max_mb * 1024 * 1024)
+
+
+def write_changed_list(path, changed):
+    with open(path, "w") as f:
+        f.writelines(f"{output}\n" for output in changed)
+
+
+def run_profiled_build(args):
+    profile, failures, changed = profile_build(
+        STATIC_PATH,
+        CONTENT_PATH,
+        TEMPLATE_PATH,
+        OUTPUT_PATH,
+        args.basepath,
+        args.copy_jobs,
+    )
+    profile.save(args.profile, args.profile_top)
+    print(format_slowest_pages(profile, args.profile_top))
+    print(f"Profile written to {args.profile}")
+    return failures, changed, len(profile.pages), []
+
+
+def run_image_stage(args):
+    if not args.images:
+        return None
+    build = process_images(
+        STATIC_PATH,
+        OUTPUT_PATH,
+        args.image_cache,
+        args.image_widths,
+        args.image_jobs,
+    )
+    logger.info(
+        "Images: %s processed, %s reused from cache, %s output file(s).",
+        build.processed,
+        build.reused,
+        len(build.outputs),
+    )
+    return build
+
+
+def run_fingerprint_stage(args):
+    if not args.fingerprint:
+        return None
+    build = fingerprint_assets(
+        STATIC_PATH, OUTPUT_PATH, args.fingerprint_state, args.copy_method
+    )
+    logger.info(
+        "Fingerprinted %s static file(s), %s hashed; manifest written to %s.",
+        len(build.assets),
+        build.hashed,
+        build.manifest_path,
+    )
+    return build
+
+
+def run_compress_stage(args):
+    if not args.compress:
+        return
+    if brotli is None:
+        logger.info("brotli is not installed; writing gzip variants only.")
+    build = compress_outputs(
+        OUTPUT_PATH,
+        args.compress_state,
+        args.compress_jobs or os.cpu_count() or 1,
+        args.compress_min_bytes,
+        args.compress_max_ratio,
+    )
+    logger.info(
+        "Compression: %s compressed, %s reused, %s skipped, %s variant(s) written.",
+        build.compressed,
+        build.reused,
+        build.skipped,
+        len(build.outputs),
+    )
+
+
+def run_incremental_build(args, collectors):
+    images = run_image_stage(args)
+    fingerprints = run_fingerprint_stage(args)
+    summary = build_incrementally(
+        STATIC_PATH,
+        CONTENT_PATH,
+        TEMPLATE_PATH,
+        OUTPUT_PATH,
+        args.basepath,
+        args.manifest,
+        args.jobs or 1,
+        args.parse_cache,
+        args.copy_method,
+        args.hash_static,
+        args.copy_jobs,
+        collectors,
+        images.assets if images else None,
+        fingerprints.assets if fingerprints else None,
+        args.mmap_threshold,
+        args.pipeline,
+    )
+    logger.info(
+        "Pages: %s rendered, %s unchanged, %s removed. Static files: "
+        "%s copied (%s bytes), %s unchanged (%s bytes), %s removed.",
+        summary.pages_rendered,
+        summary.pages_skipped,
+        summary.pages_removed,
+        summary.static_copied,
+        summary.static_bytes_copied,
+        summary.static_skipped,
+        summary.static_bytes_skipped,
+        summary.static_removed,
+    )
+    if args.explain:
+        for output, reasons in sorted(summary.reasons.items()):
+            print(f"Rebuilt {output}: {'; '.join(reasons)}")
+    page_count = summary.pages_rendered + summary.pages_skipped
+    outputs = summary.outputs + stage_outputs(args, images, fingerprints)
+    return summary.failures, summary.pages_changed, page_count, outputs
+
+
+def render_pages(
+    args, pages, dest_path, shard=None, collectors=(), images=None, assets=None
+):
+    if args.pipeline:
+        return generate_pages_pipelined(
+            pages,
+            TEMPLATE_PATH,
+            args.basepath,
+            cache_path=args.parse_cache,
+            collectors=collectors,
+            images=images,
+            assets=assets,
+            mmap_threshold=args.mmap_threshold,
+        )
+    if args.jobs is not None or args.parse_cache is not None:
+        return generate_pages(
+            pages,
+            TEMPLATE_PATH,
+            args.basepath,
+            args.jobs or 1,
+            args.parse_cache,
+            collectors,
+            images,
+            assets,
+            args.mmap_threshold,
+        )
+    changed = generate_pages_recursively(
+        CONTENT_PATH,
+        TEMPLATE_PATH,
+        dest_path,
+        args.basepath,
+        shard=shard,
+        collectors=collectors,
+        images=images,
+        assets=assets,
+        mmap_threshold=args.mmap_threshold,
+    )
+    return [], changed
+
+
+def page_outputs(pages):
+    return [os.path.join(dest_path, "index.html") for _, dest_path in pages]
+
+
+def load_page_stores(args):
+    search = SearchIndex.load(args.search_store) if args.search_index else None
+    links = LinkIndex.load(args.link_store) if args.check_links else None
+    return search, links
+
+
+def write_search_index(args, search):
+    search.save(args.search_store)
+    path = os.path.join(OUTPUT_PATH, SEARCH_INDEX_NAME)
+    search.write(path, OUTPUT_PATH, args.basepath)
+    logger.info("Search index of %s page(s) written to %s.", len(search), path)
+
+
+def check_links(args, links, outputs):
+    links.save(args.link_store)
+    files = {
+        os.path.relpath(path, OUTPUT_PATH).replace(os.sep, "/") for path in outputs
+    }
+    broken = links.check(files, OUTPUT_PATH, args.basepath)
+    logger.info(
+        "Checked %s link(s) on %s page(s): %s broken.",
+        links.link_count(),
+        len(links),
+        len(broken),
+    )
+    return broken
+
+
+def report_broken_links(broken):
+    for source, url in broken:
+        print(f"Broken link in {source}: {url}", file=sys.stderr)
+
+
+def run_shard_build(args):
+    dest_path = args.shard.output_path(args.shard_dir)
+    os.makedirs(dest_path, exist_ok=True)
+    pages = args.shard.select(collect_pages(CONTENT_PATH, dest_path), CONTENT_PATH)
+    logger.info("Rendering shard %s into %s.", args.shard, dest_path)
+    failures, changed = render_pages(args, pages, dest_path, args.shard)
+    outputs = page_outputs(pages)
+    prune_tree(dest_path, outputs)
+    return failures, changed, len(pages), outputs
+
+
+def stage_outputs(args, images, fingerprints) -> list[str]:
+    outputs = []
+    if images is not None:
+        outputs.extend(images.outputs)
+    if fingerprints is not None:
+        outputs.extend(fingerprints.outputs)
+        outputs.append(fingerprints.manifest_path)
+    if args.search_index:
+        outputs.append(os.path.join(OUTPUT_PATH, SEARCH_INDEX_NAME))
+    return outputs
+
+
+def run_full_build(args, collectors):
+    if args.shard:
+        return run_shard_build(args)
+    stats = sync_tree(
+        STATIC_PATH,
+        OUTPUT_PATH,
+        method=args.copy_method,
+        use_hash=args.hash_static,
+        workers=args.copy_jobs,
+    )
+    logger.info(
+        "Static files: %s copied (%s bytes), %s unchanged (%s bytes).",
+        stats.files_copied,
+        stats.bytes_copied,
+        stats.files_skipped,
+        stats.bytes_skipped,
+    )
+    images = run_image_stage(args)
+    fingerprints = run_fingerprint_stage(args)
+    pages = collect_pages(CONTENT_PATH, OUTPUT_PATH)
+    failures, changed = render_pages(
+        args,
+        pages,
+        OUTPUT_PATH,
+        collectors=collectors,
+        images=images.assets if images else None,
+        assets=fingerprints.assets if fingerprints else None,
+    )
+    for collector in collectors:
+        collector.retain(source for source, _ in pages)
+    outputs = stats.synced + page_outputs(pages)
+    outputs.extend(stage_outputs(args, images, fingerprints))
+    keep = outputs + compressed_siblings(outputs) if args.compress else outputs
+    removed = prune_tree(OUTPUT_PATH, keep)
+    logger.info("Removed %s stale output file(s).", len(removed))
+    return failures, changed, len(pages), outputs
+
+
+def run_merge(argv):
+    args = parse_merge_args(argv)
+    configure_logging(args.quiet)
+    shards = args.shards or list_shards(args.shard_dir)
+    try:
+        merged, copied = merge_shards(
+            shards, STATIC_PATH, CONTENT_PATH, OUTPUT_PATH, args.copy_method
+        )
+    except ShardMergeError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    logger.info(
+        "Merged %s shard(s): %s file(s), %s copied.", len(shards), merged, copied
+    )
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "serve":
+        args = parse_serve_args(argv[1:])
+        configure_logging(args.quiet)
+        serve(
+            STATIC_PATH,
+            CONTENT_PATH,
+            TEMPLATE_PATH,
+            OUTPUT_PATH,
+            args.port,
+            args.watch,
+            args.interval,
+        )
+        return
+    if argv and argv[0] == "merge":
+        run_merge(argv[1:])
+        return
+    args = parse_args(argv)
+    configure_logging(args.quiet)
+    search, links = load_page_stores(args)
+    collectors = [store for store in (search, links) if store is not None]
+    if args.profile is not None:
+        failures, changed, page_count, outputs = run_profiled_build(args)
+    elif args.incremental or args.explain:
+        failures, changed, page_count, outputs = run_incremental_build(args, collectors)
+    else:
+        failures, changed, page_count, outputs = run_full_build(args, collectors)
+    evict_parse_cache(args)
+    if search is not None:
+        write_search_index(args, search)
+    broken = check_links(args, links, outputs) if links is not None else []
+    run_compress_stage(args)
+    logger.info("%s of %s page(s) changed.", len(changed), page_count)
+    if args.changed_list:
+        write_changed_list(args.changed_list, changed)
+    report_broken_links(broken)
+    report_failures(failures)
+    if broken:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
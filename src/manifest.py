@@ -0,0 +1,53 @@
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 2
+DEFAULT_MANIFEST_PATH = ".build/manifest.json"
+HASH_LENGTH = 10
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_digest(path: str, previous: dict) -> tuple[dict, bool]:
+    stat = os.stat(path)
+    signature = f"{stat.st_size}:{stat.st_mtime_ns}"
+    entry = previous.get(path)
+    if entry is not None and entry["stat"] == signature:
+        return entry, True
+    return {"stat": signature, "digest": hash_file(path)}, False
+
+
+def hashed_name(path: str, digest: str, suffix: str = "") -> str:
+    root, extension = os.path.splitext(path)
+    return f"{root}.{digest[:HASH_LENGTH]}{suffix}{extension}"
+
+
+def empty_manifest() -> dict:
+    return {"version": MANIFEST_VERSION, "pages": {}, "static": {}, "graph": {}}
+
+
+def load_manifest(manifest_path: str) -> dict:
+    if not os.path.exists(manifest_path):
+        return empty_manifest()
+    with open(manifest_path, "r") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        return empty_manifest()
+    return manifest
+
+
+def save_manifest(manifest: dict, manifest_path: str):
+    directory = os.path.dirname(manifest_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{manifest_path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_path, manifest_path)
@@ -1,9 +1,14 @@
+import mmap
+import os
 import re
 from enum import Enum
+from typing import Iterable, Iterator
 
 from htmlnode import HTMLNode, LeafNode, ParentNode
 from inline_markdown import text_to_textnodes
-from textnode import text_node_to_html_node
+from textnode import TextNode, TextType, text_node_to_html_node
+
+PARSER_VERSION = "3"
 
 
 class BlockType(Enum):
@@ -15,60 +20,178 @@ class BlockType(Enum):
     ORDERED_LIST = "ordered_list"
 
 
+BLOCK_PATTERNS = {
+    "#": (re.compile(r"#{1,6} "), BlockType.HEADING),
+    "`": (re.compile(r"```[\s\S]*?```"), BlockType.CODE),
+    ">": (re.compile(r"> "), BlockType.QUOTE),
+    "-": (re.compile(r"-\s"), BlockType.UNORDERED_LIST),
+}
+CODE_FENCE = "```"
+IMAGE_MARKER = "!["
+CODE_FENCE_BYTES = b"```"
+BLANK_LINES_PATTERN = re.compile(rb"\n(?:\r?\n)+")
+ORDERED_LIST_PATTERN = re.compile(r"\d+\.\s")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+CODE_CONTENT_PATTERN = re.compile(r"```([\s\S]*?)```")
+UNORDERED_LIST_ITEM_PATTERN = re.compile(r"^-\s")
+ORDERED_LIST_ITEM_PATTERN = re.compile(r"^\d+\.\s+")
+HEADING_PATTERN = re.compile(r"(#{1,6}) ")
+
+
+class PageMetadata:
+    def __init__(self, title: str | None = None, outline=None):
+        self.title = title
+        self.outline = outline if outline is not None else []
+
+    def add_block(self, block: str, block_type: BlockType):
+        if block_type != BlockType.HEADING:
+            return
+        level, text = split_heading(block)
+        self.outline.append((level, text))
+        if level == 1 and self.title is None:
+            self.title = text.split("\n", 1)[0].strip()
+
+    def __eq__(self, other):
+        if not isinstance(other, PageMetadata):
+            return NotImplemented
+        return self.title == other.title and self.outline == other.outline
+
+    def __repr__(self):
+        return f"PageMetadata(title={self.title!r}, outline={self.outline!r})"
+
+
 def block_to_block_type(markdown: str) -> BlockType:
-    if re.match(r"^#{1,6} ", markdown):
-        return BlockType.HEADING
-    elif re.match(r"```[\s\S]*?```", markdown):
-        return BlockType.CODE
-    elif re.match(r"^> ", markdown):
-        return BlockType.QUOTE
-    elif re.match(r"^-\s", markdown):
-        return BlockType.UNORDERED_LIST
-    elif re.match(r"^\d+\.\s", markdown):
-        return BlockType.ORDERED_LIST
-    else:
+    if not markdown:
         return BlockType.PARAGRAPH
+    first = markdown[0]
+    entry = BLOCK_PATTERNS.get(first)
+    if entry is not None:
+        pattern, block_type = entry
+        if pattern.match(markdown):
+            return block_type
+    elif first.isdecimal() and ORDERED_LIST_PATTERN.match(markdown):
+        return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
+
+
+def iter_markdown_blocks(lines: Iterable[str]) -> Iterator[str]:
+    block_lines = []
+    in_fence = False
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line and not in_fence:
+            block = "\n".join(block_lines).strip()
+            if block:
+                yield block
+            block_lines = []
+            continue
+        stripped = line.lstrip()
+        if stripped.startswith(CODE_FENCE) and stripped.count(CODE_FENCE) % 2 == 1:
+            in_fence = not in_fence
+        block_lines.append(line)
+    block = "\n".join(block_lines).strip()
+    if block:
+        yield block
+
+
+def decode_block(buffer, start: int, end: int) -> str:
+    text = buffer[start:end].decode("utf-8")
+    return text.replace("\r\n", "\n").strip()
+
+
+def toggles_fence(buffer, start: int, end: int) -> bool:
+    if buffer.find(CODE_FENCE_BYTES, start, end) == -1:
+        return False
+    toggled = False
+    for line in buffer[start:end].split(b"\n"):
+        stripped = line.lstrip()
+        if (
+            stripped.startswith(CODE_FENCE_BYTES)
+            and stripped.count(CODE_FENCE_BYTES) % 2 == 1
+        ):
+            toggled = not toggled
+    return toggled
+
+
+def iter_buffer_blocks(buffer) -> Iterator[str]:
+    block_start = 0
+    chunk_start = 0
+    in_fence = False
+    for separator in BLANK_LINES_PATTERN.finditer(buffer):
+        if toggles_fence(buffer, chunk_start, separator.start()):
+            in_fence = not in_fence
+        chunk_start = separator.end()
+        if in_fence:
+            continue
+        block = decode_block(buffer, block_start, separator.start())
+        if block:
+            yield block
+        block_start = chunk_start
+    block = decode_block(buffer, block_start, len(buffer))
+    if block:
+        yield block
+
+
+def iter_mmap_blocks(path: str) -> Iterator[str]:
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield from iter_buffer_blocks(buffer)
+
+
+def read_markdown_blocks(path: str, mmap_threshold=None) -> Iterator[str]:
+    if mmap_threshold is not None and os.path.getsize(path) >= max(mmap_threshold, 1):
+        yield from iter_mmap_blocks(path)
+        return
+    with open(path, "r") as f:
+        yield from iter_markdown_blocks(f)
 
 
 def markdown_to_blocks(markdown: str) -> list[str]:
-    blocks = markdown.split("\n\n")
-    return [block.strip() for block in blocks if block.strip()]
+    return list(iter_markdown_blocks(markdown.split("\n")))
 
 
-def text_to_children(text: str) -> list[HTMLNode]:
+def text_to_children(text: str, sink=None, images=None) -> list[HTMLNode]:
     text_nodes = text_to_textnodes(text)
-    return [text_node_to_html_node(text_node) for text_node in text_nodes]
+    if sink is not None:
+        sink.extend(text_nodes)
+    return [text_node_to_html_node(text_node, images) for text_node in text_nodes]
 
 
-def paragraph_to_html_node(paragraph: str) -> HTMLNode:
-    normalized_text = re.sub(r"\s+", " ", paragraph).strip()
-    children = text_to_children(normalized_text)
+def paragraph_to_html_node(paragraph: str, sink=None, images=None) -> HTMLNode:
+    normalized_text = WHITESPACE_PATTERN.sub(" ", paragraph).strip()
+    children = text_to_children(normalized_text, sink, images)
     if not children:
         return LeafNode(tag="p", value="")
     return ParentNode(tag="p", children=children)
 
 
-def heading_to_html_node(heading: str) -> HTMLNode:
-    level = heading.count("#")
-    heading_content = heading[level:].strip()
-    children = text_to_children(heading_content)
+def split_heading(heading: str) -> tuple[int, str]:
+    level = len(HEADING_PATTERN.match(heading)[1])
+    return level, heading[level:].strip()
+
+
+def heading_to_html_node(heading: str, sink=None, images=None) -> HTMLNode:
+    level, heading_content = split_heading(heading)
+    children = text_to_children(heading_content, sink, images)
     if not children:
         return LeafNode(tag=f"h{level}", value="")
     return ParentNode(tag=f"h{level}", children=children)
 
 
-def code_to_html_node(code: str) -> HTMLNode:
-    code_content = re.findall(r"```([\s\S]*?)```", code)
+def code_to_html_node(code: str, sink=None, images=None) -> HTMLNode:
+    code_content = CODE_CONTENT_PATTERN.search(code)
     if code_content:
-        code = code_content[0]
+        code = code_content[1]
         lines = [line.strip() for line in code.split("\n")]
         processed_code = "\n".join(lines[1:])
+        if sink is not None:
+            sink.append(TextNode(processed_code, TextType.CODE))
         code_node = LeafNode(tag="code", value=processed_code)
         return ParentNode(tag="pre", children=[code_node])
     return ParentNode(tag="pre", children=[LeafNode(tag="code", value="")])
 
 
-def quote_to_html_node(quote: str) -> HTMLNode:
+def quote_to_html_node(quote: str, sink=None, images=None) -> HTMLNode:
     lines = quote.split("\n")
     lines = [line.strip() for line in lines]
     new_lines = []
@@ -77,22 +200,19 @@ def quote_to_html_node(quote: str) -> HTMLNode:
             raise ValueError("invalid quote block")
         new_lines.append(line.lstrip(">").strip())
     content = " ".join(new_lines)
-    children = text_to_children(content)
+    children = text_to_children(content, sink, images)
     if not children:
         return LeafNode(tag="blockquote", value="")
     return ParentNode(tag="blockquote", children=children)
 
 
-def unordered_list_to_html_node(block: str) -> HTMLNode:
+def unordered_list_to_html_node(block: str, sink=None, images=None) -> HTMLNode:
     items = block.split("\n")
     items = [item.strip() for item in items]
-    items = [re.sub(r"^-\s", "", item) for item in items]
-    list_items = [
-        ParentNode(tag="li", children=text_to_children(item)) for item in items
-    ]
+    items = [UNORDERED_LIST_ITEM_PATTERN.sub("", item) for item in items]
     list_items = []
     for item in items:
-        children = text_to_children(item)
+        children = text_to_children(item, sink, images)
         if not children:
             list_items.append(LeafNode(tag="li", value=""))
         else:
@@ -100,37 +220,57 @@ def unordered_list_to_html_node(block: str) -> HTMLNode:
     return ParentNode(tag="ul", children=list_items)
 
 
-def ordered_list_to_html_node(block: str) -> HTMLNode:
+def ordered_list_to_html_node(block: str, sink=None, images=None) -> HTMLNode:
     items = block.split("\n")
     items = [item.strip() for item in items]
-    items = [re.sub(r"^\d+\.\s+", "", item) for item in items]
+    items = [ORDERED_LIST_ITEM_PATTERN.sub("", item) for item in items]
     list_items = [
-        ParentNode(tag="li", children=text_to_children(item)) for item in items
+        ParentNode(tag="li", children=text_to_children(item, sink, images))
+        for item in items
     ]
     return ParentNode(tag="ol", children=list_items)
 
 
-def create_html_node(block: str, block_type: BlockType) -> HTMLNode:
-    if block_type == BlockType.PARAGRAPH:
-        return paragraph_to_html_node(block)
-    elif block_type == BlockType.HEADING:
-        return heading_to_html_node(block)
-    elif block_type == BlockType.CODE:
-        return code_to_html_node(block)
-    elif block_type == BlockType.QUOTE:
-        return quote_to_html_node(block)
-    elif block_type == BlockType.UNORDERED_LIST:
-        return unordered_list_to_html_node(block)
-    elif block_type == BlockType.ORDERED_LIST:
-        return ordered_list_to_html_node(block)
-    else:
+BLOCK_CONVERTERS = {
+    BlockType.PARAGRAPH: paragraph_to_html_node,
+    BlockType.HEADING: heading_to_html_node,
+    BlockType.CODE: code_to_html_node,
+    BlockType.QUOTE: quote_to_html_node,
+    BlockType.UNORDERED_LIST: unordered_list_to_html_node,
+    BlockType.ORDERED_LIST: ordered_list_to_html_node,
+}
+
+
+def create_html_node(
+    block: str, block_type: BlockType, cache=None, sink=None, images=None
+) -> HTMLNode:
+    converter = BLOCK_CONVERTERS.get(block_type)
+    if converter is None:
         raise ValueError(f"Unknown block type: {block_type}")
+    if cache is None or (images and IMAGE_MARKER in block):
+        return converter(block, sink, images)
+    html = cache.get(block) if sink is None else None
+    if html is None:
+        html = converter(block, sink, images).to_html()
+        cache.put(block, html)
+    return LeafNode(html)
 
 
-def markdown_to_html_node(markdown: str) -> HTMLNode:
-    blocks = markdown_to_blocks(markdown)
+def parse_markdown(
+    markdown: str | Iterable[str], cache=None, sink=None, images=None
+) -> tuple[HTMLNode, PageMetadata]:
+    if isinstance(markdown, str):
+        blocks = iter_markdown_blocks(markdown.split("\n"))
+    else:
+        blocks = markdown
     nodes = []
+    metadata = PageMetadata()
     for block in blocks:
         type = block_to_block_type(block)
-        nodes.append(create_html_node(block, type))
-    return ParentNode(tag="div", children=nodes)
+        metadata.add_block(block, type)
+        nodes.append(create_html_node(block, type, cache, sink, images))
+    return ParentNode(tag="div", children=nodes), metadata
+
+
+def markdown_to_html_node(markdown: str | Iterable[str], cache=None) -> HTMLNode:
+    return parse_markdown(markdown, cache)[0]
@@ -0,0 +1,86 @@
+import hashlib
+import os
+
+from manifest import hash_file
+
+COPY_CHUNK_SIZE = 1 << 16
+
+
+def copy_prefix(source, out, length: int):
+    source.seek(0)
+    while length:
+        chunk = source.read(min(length, COPY_CHUNK_SIZE))
+        out.write(chunk)
+        length -= len(chunk)
+
+
+def open_existing(path: str):
+    try:
+        return open(path, "rb")
+    except FileNotFoundError:
+        return None
+
+
+class OutputFile:
+    def __init__(self, path: str):
+        self.path = path
+        self.temp_path = f"{path}.{os.getpid()}.tmp"
+        self.changed = False
+        self.existing = None
+        self.matched = 0
+        self.file = None
+
+    def __enter__(self):
+        self.existing = open_existing(self.path)
+        if self.existing is None:
+            self.file = open(self.temp_path, "wb")
+        return self
+
+    def diverge(self):
+        self.file = open(self.temp_path, "wb")
+        copy_prefix(self.existing, self.file, self.matched)
+        self.existing.close()
+        self.existing = None
+
+    def write(self, text: str):
+        data = text.encode("utf-8")
+        if self.file is None:
+            if self.existing.read(len(data)) == data:
+                self.matched += len(data)
+                return
+            self.diverge()
+        self.file.write(data)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.existing is not None:
+            if exc_type is None and self.file is None and self.existing.read(1):
+                self.diverge()
+            else:
+                self.existing.close()
+        if self.file is None:
+            return False
+        self.file.close()
+        if exc_type is not None:
+            os.remove(self.temp_path)
+            return False
+        os.replace(self.temp_path, self.path)
+        self.changed = True
+        return False
+
+    def __repr__(self):
+        return f"OutputFile(path={self.path}, changed={self.changed})"
+
+
+def write_if_changed(path: str, text: str) -> bool:
+    data = text.encode("utf-8")
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        size = None
+    if size == len(data) and hash_file(path) == hashlib.sha256(data).hexdigest():
+        return False
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    return True
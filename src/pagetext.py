@@ -0,0 +1,67 @@
+import json
+import os
+
+
+class PageText:
+    def __init__(self):
+        self.title = None
+        self.text_nodes = []
+
+    def __repr__(self):
+        return f"PageText(title={self.title!r}, text_nodes={len(self.text_nodes)})"
+
+
+class PageStore:
+    version = 1
+    description = "page store"
+
+    def __init__(self, pages: dict[str, dict] | None = None):
+        self.pages = pages if pages is not None else {}
+
+    @classmethod
+    def entry(cls, output_path: str, page_text: PageText) -> dict:
+        raise NotImplementedError
+
+    def add(self, source: str, output_path: str, page_text: PageText):
+        self.pages[source] = self.entry(output_path, page_text)
+
+    def remove(self, source: str):
+        self.pages.pop(source, None)
+
+    def retain(self, sources):
+        sources = set(sources)
+        for source in list(self.pages):
+            if source not in sources:
+                del self.pages[source]
+
+    @classmethod
+    def load(cls, path: str):
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r") as f:
+            store = json.load(f)
+        if store.get("version") != cls.version:
+            return cls()
+        return cls(store["pages"])
+
+    def save(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"version": self.version, "pages": self.pages}, f)
+        os.replace(temp_path, path)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(pages={len(self.pages)})"
+
+
+def page_url(output_path: str, dest_path: str, basepath: str) -> str:
+    directory = os.path.relpath(os.path.dirname(output_path), dest_path)
+    if directory == ".":
+        return basepath
+    return f"{basepath}{directory.replace(os.sep, '/')}/"
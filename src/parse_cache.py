@@ -0,0 +1,115 @@
+import functools
+import hashlib
+import os
+import sqlite3
+import time
+
+from markdown_blocks import PARSER_VERSION
+
+DEFAULT_CACHE_PATH = ".build/parse-cache.sqlite3"
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+class ParseCache:
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, version: str = PARSER_VERSION):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.version = version
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS fragments ("
+            "key TEXT PRIMARY KEY, html TEXT NOT NULL, "
+            "size INTEGER NOT NULL, last_used INTEGER NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS fragments_last_used ON fragments (last_used)"
+        )
+        self.connection.commit()
+        self.hits = 0
+        self.misses = 0
+        self.pending = {}
+        self.used = set()
+
+    def key(self, block: str) -> str:
+        return hashlib.sha256(f"{self.version}\0{block}".encode()).hexdigest()
+
+    def get(self, block: str) -> str | None:
+        key = self.key(block)
+        html = self.pending.get(key)
+        if html is None:
+            row = self.connection.execute(
+                "SELECT html FROM fragments WHERE key = ?", (key,)
+            ).fetchone()
+            html = row[0] if row else None
+        if html is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.used.add(key)
+        return html
+
+    def put(self, block: str, html: str):
+        self.pending[self.key(block)] = html
+
+    def flush(self):
+        if not self.pending and not self.used:
+            return
+        now = time.time_ns()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO fragments (key, html, size, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (key, html, len(html.encode()), now)
+                    for key, html in self.pending.items()
+                ],
+            )
+            self.connection.executemany(
+                "UPDATE fragments SET last_used = ? WHERE key = ?",
+                [(now, key) for key in self.used],
+            )
+        self.pending = {}
+        self.used = set()
+
+    def size(self) -> int:
+        self.flush()
+        row = self.connection.execute("SELECT SUM(size) FROM fragments").fetchone()
+        return row[0] or 0
+
+    def evict(self, max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> int:
+        excess = self.size() - max_bytes
+        if excess <= 0:
+            return 0
+        stale = []
+        for key, size in self.connection.execute(
+            "SELECT key, size FROM fragments ORDER BY last_used, key"
+        ):
+            if excess <= 0:
+                break
+            stale.append((key,))
+            excess -= size
+        with self.connection:
+            self.connection.executemany("DELETE FROM fragments WHERE key = ?", stale)
+        return len(stale)
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return f"ParseCache(path={self.path}, hits={self.hits}, misses={self.misses})"
+
+
+@functools.lru_cache(maxsize=None)
+def shared_parse_cache(path: str) -> ParseCache:
+    return ParseCache(path)
@@ -0,0 +1,95 @@
+import logging
+import os
+import queue
+import threading
+
+from generate_page import render_page, write_page
+from markdown_blocks import read_markdown_blocks
+from parse_cache import shared_parse_cache
+from pagetext import PageText
+from template import Template
+
+logger = logging.getLogger(__name__)
+
+DONE = None
+
+
+def read_stage(pages, read_queue, mmap_threshold=None):
+    for index, (from_path, dest_path) in enumerate(pages):
+        try:
+            markdown = list(read_markdown_blocks(from_path, mmap_threshold))
+        except Exception as e:
+            read_queue.put((index, from_path, dest_path, None, e))
+            continue
+        read_queue.put((index, from_path, dest_path, markdown, None))
+    read_queue.put(DONE)
+
+
+def write_stage(write_queue, errors, changed):
+    while (item := write_queue.get()) is not DONE:
+        index, from_path, dest_path, html = item
+        try:
+            if write_page(dest_path, html):
+                changed[index] = os.path.join(dest_path, "index.html")
+        except Exception as e:
+            errors[index] = (from_path, f"{type(e).__name__}: {e}")
+
+
+def generate_pages_pipelined(
+    pages,
+    template_path,
+    basepath="/",
+    queue_size=16,
+    cache_path=None,
+    collectors=(),
+    images=None,
+    assets=None,
+    mmap_threshold=None,
+) -> tuple[list[tuple[str, str]], list[str]]:
+    pages = sorted(pages)
+    template = Template.from_file(template_path, basepath, assets)
+    cache = shared_parse_cache(cache_path) if cache_path else None
+    read_queue = queue.Queue(maxsize=queue_size)
+    write_queue = queue.Queue(maxsize=queue_size)
+    errors = {}
+    changed = {}
+
+    reader = threading.Thread(
+        target=read_stage, args=(pages, read_queue, mmap_threshold), daemon=True
+    )
+    writer = threading.Thread(target=write_stage, args=(write_queue, errors, changed))
+    reader.start()
+    writer.start()
+    try:
+        while (item := read_queue.get()) is not DONE:
+            index, from_path, dest_path, markdown, error = item
+            if error is not None:
+                errors[index] = (from_path, f"{type(error).__name__}: {error}")
+                continue
+            logger.info(
+                "Generating page from %s to %s using %s",
+                from_path,
+                dest_path,
+                template_path,
+            )
+            page_text = PageText() if collectors else None
+            try:
+                html = render_page(markdown, template, cache, page_text, images)
+            except Exception as e:
+                errors[index] = (from_path, f"{type(e).__name__}: {e}")
+                continue
+            output_path = os.path.join(dest_path, "index.html")
+            for collector in collectors:
+                collector.add(from_path, output_path, page_text)
+            write_queue.put((index, from_path, dest_path, html))
+        reader.join()
+    finally:
+        write_queue.put(DONE)
+        writer.join()
+        if cache is not None:
+            cache.flush()
+    failures = [errors[index] for index in sorted(errors)]
+    for from_path, _ in failures:
+        for collector in collectors:
+            collector.remove(from_path)
+    return failures, [changed[index] for index in sorted(changed)]
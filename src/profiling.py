@@ -0,0 +1,128 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+from copystatic import prune_tree, sync_tree
+from generate_page import collect_pages, page_title, write_page
+from htmlnode import ParentNode
+from markdown_blocks import (
+    PageMetadata,
+    block_to_block_type,
+    create_html_node,
+    markdown_to_blocks,
+)
+from template import Template
+
+STAGES = (
+    "static_copy",
+    "file_read",
+    "block_split",
+    "block_classification",
+    "inline_parsing",
+    "html_serialization",
+    "template_substitution",
+    "write",
+)
+DEFAULT_PROFILE_PATH = ".build/profile.json"
+
+
+class BuildProfile:
+    def __init__(self):
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.pages = {}
+
+    def add(self, stage: str, seconds: float, page: str | None = None):
+        self.stages[stage] += seconds
+        if page is not None:
+            page_stages = self.pages.setdefault(page, dict.fromkeys(STAGES[1:], 0.0))
+            page_stages[stage] += seconds
+
+    @contextmanager
+    def measure(self, stage: str, page: str | None = None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start, page)
+
+    def slowest_pages(self, top: int = 10) -> list[dict]:
+        totals = sorted(
+            ((sum(stages.values()), page) for page, stages in self.pages.items()),
+            key=lambda total: (-total[0], total[1]),
+        )
+        return [
+            {"path": page, "seconds": seconds, "stages": self.pages[page]}
+            for seconds, page in totals[:top]
+        ]
+
+    def report(self, top: int = 10) -> dict:
+        return {
+            "total_seconds": sum(self.stages.values()),
+            "page_count": len(self.pages),
+            "stages": self.stages,
+            "slowest_pages": self.slowest_pages(top),
+        }
+
+    def save(self, path: str = DEFAULT_PROFILE_PATH, top: int = 10):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.report(top), f, indent=2)
+
+
+def generate_page_profiled(
+    from_path, dest_path, template, profile: BuildProfile
+) -> bool:
+    with profile.measure("file_read", from_path):
+        with open(from_path, "r") as f:
+            markdown = f.read()
+    with profile.measure("block_split", from_path):
+        blocks = markdown_to_blocks(markdown)
+    with profile.measure("block_classification", from_path):
+        block_types = [block_to_block_type(block) for block in blocks]
+        metadata = PageMetadata()
+        for block, block_type in zip(blocks, block_types):
+            metadata.add_block(block, block_type)
+    with profile.measure("inline_parsing", from_path):
+        nodes = [
+            create_html_node(block, block_type)
+            for block, block_type in zip(blocks, block_types)
+        ]
+    with profile.measure("html_serialization", from_path):
+        content = ParentNode(tag="div", children=nodes).to_html()
+    with profile.measure("template_substitution", from_path):
+        html = template.render({"Title": page_title(metadata), "Content": content})
+    with profile.measure("write", from_path):
+        return write_page(dest_path, html)
+
+
+def profile_build(
+    static_path, content_path, template_path, dest_path, basepath="/", copy_jobs=1
+) -> tuple[BuildProfile, list[tuple[str, str]], list[str]]:
+    profile = BuildProfile()
+    with profile.measure("static_copy"):
+        stats = sync_tree(static_path, dest_path, workers=copy_jobs)
+    template = Template.from_file(template_path, basepath)
+    pages = sorted(collect_pages(content_path, dest_path))
+    failures = []
+    changed = []
+    for from_path, page_dest_path in pages:
+        try:
+            if generate_page_profiled(from_path, page_dest_path, template, profile):
+                changed.append(os.path.join(page_dest_path, "index.html"))
+        except Exception as e:
+            failures.append((from_path, f"{type(e).__name__}: {e}"))
+    outputs = [
+        os.path.join(page_dest_path, "index.html") for _, page_dest_path in pages
+    ]
+    prune_tree(dest_path, stats.synced + outputs)
+    return profile, failures, changed
+
+
+def format_slowest_pages(profile: BuildProfile, top: int = 10) -> str:
+    lines = [f"{'seconds':>10}  page"]
+    for page in profile.slowest_pages(top):
+        lines.append(f"{page['seconds']:>10.4f}  {page['path']}")
+    return "\n".join(lines)
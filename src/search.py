@@ -0,0 +1,87 @@
+import json
+import re
+
+from output import write_if_changed
+from pagetext import PageStore, PageText, page_url
+
+SEARCH_INDEX_VERSION = 1
+SEARCH_INDEX_NAME = "search-index.json"
+DEFAULT_SEARCH_STORE_PATH = ".build/search-pages.json"
+TERM_PATTERN = re.compile(r"\w+")
+
+
+def page_terms(text_nodes) -> dict[str, list[int]]:
+    terms = {}
+    position = 0
+    for text_node in text_nodes:
+        for match in TERM_PATTERN.finditer(text_node.text):
+            terms.setdefault(match[0].lower(), []).append(position)
+            position += 1
+    return terms
+
+
+# Each posting list is flattened to integers: for every page containing
+# the term, the page id delta, the number of positions, then the position
+# deltas. Page ids index the "pages" list of [url, title] pairs.
+def pack_postings(postings: list[tuple[int, list[int]]]) -> list[int]:
+    packed = []
+    previous_page = 0
+    for page_id, positions in postings:
+        packed.append(page_id - previous_page)
+        packed.append(len(positions))
+        previous_position = 0
+        for position in positions:
+            packed.append(position - previous_position)
+            previous_position = position
+        previous_page = page_id
+    return packed
+
+
+def unpack_postings(packed: list[int]) -> list[tuple[int, list[int]]]:
+    postings = []
+    page_id = 0
+    index = 0
+    while index < len(packed):
+        page_id += packed[index]
+        count = packed[index + 1]
+        index += 2
+        positions = []
+        position = 0
+        for delta in packed[index : index + count]:
+            position += delta
+            positions.append(position)
+        index += count
+        postings.append((page_id, positions))
+    return postings
+
+
+class SearchIndex(PageStore):
+    version = SEARCH_INDEX_VERSION
+    description = "the search index"
+
+    @classmethod
+    def entry(cls, output_path: str, page_text: PageText) -> dict:
+        return {
+            "output": output_path,
+            "title": page_text.title,
+            "terms": page_terms(page_text.text_nodes),
+        }
+
+    def build(self, dest_path: str, basepath: str = "/") -> dict:
+        entries = sorted(
+            (page_url(entry["output"], dest_path, basepath), entry)
+            for entry in self.pages.values()
+        )
+        postings = {}
+        for page_id, (_, entry) in enumerate(entries):
+            for term, positions in entry["terms"].items():
+                postings.setdefault(term, []).append((page_id, positions))
+        return {
+            "version": SEARCH_INDEX_VERSION,
+            "pages": [[url, entry["title"]] for url, entry in entries],
+            "terms": {term: pack_postings(postings[term]) for term in sorted(postings)},
+        }
+
+    def write(self, path: str, dest_path: str, basepath: str = "/") -> bool:
+        index = self.build(dest_path, basepath)
+        return write_if_changed(path, json.dumps(index, separators=(",", ":")))
@@ -0,0 +1,99 @@
+import hashlib
+import os
+
+from copystatic import collect_files, prune_tree, sync_file
+from generate_page import collect_pages
+
+DEFAULT_SHARD_PATH = ".build/shards"
+
+
+class ShardMergeError(Exception):
+    def __init__(self, missing: list[str], duplicates: list[tuple[str, list[str]]]):
+        self.missing = missing
+        self.duplicates = duplicates
+        details = [f"missing {path}" for path in missing]
+        details.extend(f"{path} in {', '.join(owners)}" for path, owners in duplicates)
+        super().__init__(
+            f"Cannot merge shards: {len(missing)} missing and "
+            f"{len(duplicates)} duplicated path(s): {'; '.join(details)}"
+        )
+
+
+class Shard:
+    def __init__(self, index: int, count: int):
+        if count < 1 or not 1 <= index <= count:
+            raise ValueError(f"Invalid shard {index}/{count}")
+        self.index = index
+        self.count = count
+
+    @classmethod
+    def parse(cls, value: str) -> "Shard":
+        index, separator, count = value.partition("/")
+        if not separator:
+            raise ValueError(f"Expected a shard like 1/4, got {value}")
+        return cls(int(index), int(count))
+
+    def owns(self, relative_path: str) -> bool:
+        return shard_index(relative_path, self.count) == self.index
+
+    def select(self, pages, content_path) -> list[tuple[str, str]]:
+        return [
+            page for page in pages if self.owns(os.path.relpath(page[0], content_path))
+        ]
+
+    def output_path(self, root: str = DEFAULT_SHARD_PATH) -> str:
+        return os.path.join(root, f"{self.index}-of-{self.count}")
+
+    def __eq__(self, other):
+        if not isinstance(other, Shard):
+            return NotImplemented
+        return self.index == other.index and self.count == other.count
+
+    def __repr__(self):
+        return f"Shard({self.index}/{self.count})"
+
+
+def shard_index(relative_path: str, count: int) -> int:
+    key = relative_path.replace(os.sep, "/").encode("utf-8")
+    digest = hashlib.sha1(key).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def list_shards(root: str = DEFAULT_SHARD_PATH) -> list[str]:
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        os.path.join(root, name)
+        for name in os.listdir(root)
+        if os.path.isdir(os.path.join(root, name))
+    )
+
+
+def merge_shards(
+    shard_paths, static_path, content_path, dest_path, method="auto"
+) -> tuple[int, int]:
+    owners = {}
+    files = []
+    for owner in [static_path, *shard_paths]:
+        for source, destination in collect_files(owner, dest_path):
+            relative = os.path.relpath(destination, dest_path)
+            owners.setdefault(relative, []).append(owner)
+            files.append((source, destination))
+
+    expected = {
+        os.path.relpath(os.path.join(dest_dir, "index.html"), dest_path)
+        for _, dest_dir in collect_pages(content_path, dest_path)
+    }
+    missing = sorted(expected - owners.keys())
+    duplicates = sorted(
+        (relative, paths) for relative, paths in owners.items() if len(paths) > 1
+    )
+    if missing or duplicates:
+        raise ShardMergeError(missing, duplicates)
+
+    copied = 0
+    for source, destination in files:
+        _, changed = sync_file(source, destination, method)
+        copied += changed
+    prune_tree(dest_path, [destination for _, destination in files])
+    return len(files), copied
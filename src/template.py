@@ -0,0 +1,99 @@
+import io
+import re
+
+from htmlnode import HTMLNode
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{ (Title|Content) \}\}")
+URL_ATTRIBUTE_PATTERN = re.compile(r'(href|src)="/')
+ASSET_URL_PATTERN = re.compile(r'(href|src)="(/[^"?#]*)')
+SRCSET_PATTERN = re.compile(r'srcset="([^"]*)"')
+
+
+def referenced_urls(html: str) -> list[str]:
+    urls = [match[2] for match in ASSET_URL_PATTERN.finditer(html)]
+    for match in SRCSET_PATTERN.finditer(html):
+        urls.extend(candidate.split(" ", 1)[0] for candidate in match[1].split(", "))
+    return urls
+
+
+def rewrite_srcset(srcset: str, basepath: str, assets=None) -> str:
+    candidates = []
+    for candidate in srcset.split(", "):
+        if candidate.startswith("/") and not candidate.startswith("//"):
+            url, space, descriptor = candidate.partition(" ")
+            if assets:
+                url = assets.get(url, url)
+            candidate = basepath + url[1:] + space + descriptor
+        candidates.append(candidate)
+    return ", ".join(candidates)
+
+
+def rewrite_basepath(html: str, basepath: str, assets=None) -> str:
+    if assets:
+        html = ASSET_URL_PATTERN.sub(
+            lambda match: f'{match[1]}="{basepath}{assets.get(match[2], match[2])[1:]}',
+            html,
+        )
+    elif basepath == "/":
+        return html
+    else:
+        html = URL_ATTRIBUTE_PATTERN.sub(lambda match: f'{match[1]}="{basepath}', html)
+    if "srcset=" not in html:
+        return html
+    return SRCSET_PATTERN.sub(
+        lambda match: f'srcset="{rewrite_srcset(match[1], basepath, assets)}"', html
+    )
+
+
+class BasepathWriter:
+    def __init__(self, out, basepath: str, assets=None):
+        self.out = out
+        self.basepath = basepath
+        self.assets = assets
+
+    def write(self, html: str):
+        self.out.write(rewrite_basepath(html, self.basepath, self.assets))
+
+
+class Template:
+    def __init__(self, source: str, basepath: str = "/", assets=None):
+        self.basepath = basepath
+        self.assets = assets
+        self.segments = []
+        self.slots = []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            self.segments.append(
+                rewrite_basepath(source[position : match.start()], basepath, assets)
+            )
+            self.slots.append(match[1])
+            position = match.end()
+        self.segments.append(rewrite_basepath(source[position:], basepath, assets))
+
+    @classmethod
+    def from_file(
+        cls, template_path: str, basepath: str = "/", assets=None
+    ) -> "Template":
+        with open(template_path, "r") as f:
+            return cls(f.read(), basepath, assets)
+
+    def render(self, values: dict[str, str | HTMLNode]) -> str:
+        buffer = io.StringIO()
+        self.write(buffer, values)
+        return buffer.getvalue()
+
+    def write(self, out, values: dict[str, str | HTMLNode]):
+        slot_out = out
+        if self.basepath != "/" or self.assets:
+            slot_out = BasepathWriter(out, self.basepath, self.assets)
+        out.write(self.segments[0])
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            value = values[slot]
+            if isinstance(value, HTMLNode):
+                value.write_html(slot_out)
+            else:
+                slot_out.write(value)
+            out.write(segment)
+
+    def __repr__(self):
+        return f"Template(slots={self.slots}, basepath={self.basepath})"
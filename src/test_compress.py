@@ -0,0 +1,55 @@
+import base64
+import gzip
+import os
+import unittest
+
+from compress import brotli, compress_outputs
+from fixtures import SiteTestCase, write_file
+
+
+class TestCompressOutputs(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.state = os.path.join(self.root, ".build", "compress.json")
+        self.page = os.path.join(self.dest, "blog", "index.html")
+        write_file(self.page, "<p>hello world</p>" * 200)
+        write_file(os.path.join(self.dest, "small.css"), "body {}")
+        random_text = base64.b64encode(os.urandom(1536)).decode()
+        write_file(os.path.join(self.dest, "random.js"), random_text)
+
+    def compress(self, jobs=1):
+        return compress_outputs(self.dest, self.state, jobs, 1024, 0.6)
+
+    def test_writes_compressed_siblings(self):
+        build = self.compress(jobs=2)
+        self.assertIn(self.page + ".gz", build.outputs)
+        with gzip.open(self.page + ".gz", "rt") as f:
+            self.assertEqual(f.read(), "<p>hello world</p>" * 200)
+        self.assertEqual(os.path.exists(self.page + ".br"), brotli is not None)
+
+    def test_skips_small_and_poorly_compressed_files(self):
+        build = self.compress()
+        self.assertEqual(build.skipped, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "small.css.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "random.js.gz")))
+
+    def test_unchanged_sources_are_reused(self):
+        self.compress()
+        os.utime(self.page)
+        build = self.compress()
+        self.assertEqual((build.compressed, build.reused), (0, 2))
+        write_file(self.page, "<p>edited</p>" * 200)
+        build = self.compress()
+        self.assertEqual((build.compressed, build.reused), (1, 1))
+        with gzip.open(self.page + ".gz", "rt") as f:
+            self.assertEqual(f.read(), "<p>edited</p>" * 200)
+
+    def test_removed_source_drops_its_siblings(self):
+        self.compress()
+        os.remove(self.page)
+        self.compress()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import os
+import unittest
+from unittest import mock
+
+from copystatic import (
+    CopyTreeError,
+    collect_files,
+    copy_file,
+    files_match,
+    prune_tree,
+    sync_files_threaded,
+    sync_tree,
+)
+from fixtures import SiteTestCase, write_file
+
+
+class TestSyncTree(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        write_file(os.path.join(self.static, "index.css"), "body {}")
+        write_file(os.path.join(self.static, "images", "a.png"), "png data")
+
+    def test_copy_file_preserves_mtime(self):
+        source = os.path.join(self.static, "index.css")
+        destination = os.path.join(self.dest, "index.css")
+        self.assertIn(
+            copy_file(source, destination), ["reflink", "copy_file_range", "copy"]
+        )
+        self.assertTrue(files_match(source, destination))
+
+    def test_copy_file_hardlink(self):
+        source = os.path.join(self.static, "index.css")
+        destination = os.path.join(self.dest, "index.css")
+        self.assertEqual(copy_file(source, destination, "hardlink"), "hardlink")
+        self.assertTrue(os.path.samefile(source, destination))
+
+    def test_copy_file_unknown_method(self):
+        self.assertRaises(ValueError, copy_file, self.static, self.dest, "symlink")
+
+    def test_files_match_with_hash(self):
+        source = os.path.join(self.static, "index.css")
+        destination = os.path.join(self.dest, "index.css")
+        write_file(destination, "body {}")
+        os.utime(destination, ns=(0, 0))
+        self.assertFalse(files_match(source, destination))
+        self.assertTrue(files_match(source, destination, use_hash=True))
+
+    def test_sync_tree_skips_unchanged_files(self):
+        first = sync_tree(self.static, self.dest)
+        self.assertEqual(first.files_copied, 2)
+        self.assertEqual(first.bytes_copied, 15)
+        second = sync_tree(self.static, self.dest, first.synced)
+        self.assertEqual(second.files_copied, 0)
+        self.assertEqual(second.files_skipped, 2)
+        self.assertEqual(second.bytes_skipped, 15)
+
+    def test_sync_tree_copies_changed_files(self):
+        first = sync_tree(self.static, self.dest)
+        write_file(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        second = sync_tree(self.static, self.dest, first.synced)
+        self.assertEqual(second.files_copied, 1)
+        with open(os.path.join(self.dest, "index.css")) as f:
+            self.assertEqual(f.read(), "body { margin: 0 }")
+
+    def test_sync_tree_removes_only_stale_files(self):
+        first = sync_tree(self.static, self.dest)
+        write_file(os.path.join(self.dest, "index.html"), "page")
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        second = sync_tree(self.static, self.dest, first.synced)
+        self.assertEqual(second.files_removed, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_sync_tree_with_workers(self):
+        stats = sync_tree(self.static, self.dest, workers=4)
+        self.assertEqual(stats.files_copied, 2)
+        self.assertEqual(len(stats.synced), 2)
+        for path in stats.synced:
+            self.assertTrue(os.path.isfile(path))
+
+    def test_sync_tree_with_workers_aggregates_errors(self):
+        write_file(os.path.join(self.static, "js", "app.js"), "run()")
+        with mock.patch("copystatic.copy_file", side_effect=PermissionError("denied")):
+            with self.assertRaises(CopyTreeError) as context:
+                sync_tree(self.static, self.dest, workers=4)
+        self.assertEqual(len(context.exception.errors), 3)
+        self.assertTrue(os.path.isdir(os.path.join(self.dest, "js")))
+
+    def test_prune_tree_keeps_listed_files(self):
+        stats = sync_tree(self.static, self.dest)
+        write_file(os.path.join(self.dest, "old", "index.html"), "page")
+        removed = prune_tree(self.dest, stats.synced)
+        self.assertEqual(removed, [os.path.join(self.dest, "old", "index.html")])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "old")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.css")))
+
+
+class TestSyncFilesThreaded(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        for directory in ["a", "b", os.path.join("b", "c")]:
+            for name in ["one.txt", "two.txt", "bad.txt"]:
+                write_file(os.path.join(self.static, directory, name), directory)
+        self.files = collect_files(self.static, self.dest)
+
+    def test_results_follow_file_order(self):
+        results = sync_files_threaded(self.files, workers=2)
+        self.assertEqual(
+            results, [(os.path.getsize(source), True) for source, _ in self.files]
+        )
+        with open(os.path.join(self.dest, "b", "c", "two.txt")) as f:
+            self.assertEqual(f.read(), os.path.join("b", "c"))
+
+    def test_errors_are_aggregated(self):
+        copy = copy_file
+
+        def failing_copy(source, destination, method):
+            if source.endswith("bad.txt"):
+                raise PermissionError(f"cannot read {source}")
+            return copy(source, destination, method)
+
+        with mock.patch("copystatic.copy_file", side_effect=failing_copy):
+            with self.assertRaises(CopyTreeError) as context:
+                sync_files_threaded(self.files, workers=4)
+        self.assertEqual(
+            [path for path, _ in context.exception.errors],
+            sorted(
+                os.path.join(self.static, directory, "bad.txt")
+                for directory in ["a", "b", os.path.join("b", "c")]
+            ),
+        )
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "b", "c", "one.txt")))
+
+    def test_unexpected_errors_are_reported(self):
+        with mock.patch("copystatic.copy_file", side_effect=ValueError("boom")):
+            with self.assertRaises(CopyTreeError) as context:
+                sync_files_threaded(self.files, workers=4)
+        self.assertEqual(len(context.exception.errors), 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+from depgraph import DependencyGraph, asset_inputs, page_inputs, static_inputs
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = DependencyGraph()
+        self.graph.add("docs/a/index.html", {"a.md": "1", "t.html": "x"})
+        self.graph.add("docs/b/index.html", {"b.md": "2", "t.html": "x"})
+        self.graph.add("docs/style.css", {"style.css": "7:1"})
+
+    def test_dependents(self):
+        self.assertEqual(
+            self.graph.dependents("t.html"),
+            ["docs/a/index.html", "docs/b/index.html"],
+        )
+        self.assertEqual(self.graph.dependents("style.css"), ["docs/style.css"])
+        self.assertEqual(self.graph.dependents("missing.md"), [])
+
+    def test_explain_unknown_output(self):
+        self.assertEqual(
+            self.graph.explain("docs/c/index.html", {"c.md": "3"}),
+            ["no previous build recorded"],
+        )
+
+    def test_explain_changed_added_and_dropped_inputs(self):
+        reasons = self.graph.explain(
+            "docs/a/index.html", {"a.md": "9", "basepath": "/"}
+        )
+        self.assertEqual(
+            reasons,
+            ["a.md changed", "new dependency basepath", "no longer depends on t.html"],
+        )
+
+    def test_explain_missing_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "index.html")
+            self.graph.add(output, {"a.md": "1"})
+            self.assertEqual(
+                self.graph.explain(output, {"a.md": "1"}), ["output is missing"]
+            )
+            open(output, "w").close()
+            self.assertEqual(self.graph.explain(output, {"a.md": "1"}), [])
+
+    def test_round_trip(self):
+        graph = DependencyGraph.from_dict(self.graph.to_dict())
+        self.assertEqual(graph.edges, self.graph.edges)
+        self.assertEqual(len(graph), 3)
+
+    def test_inputs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "index.md")
+            with open(source, "w") as f:
+                f.write("# Home")
+            inputs = page_inputs(source, "template.html", "abc", "/site/")
+            self.assertEqual(inputs["template.html"], "abc")
+            self.assertEqual(inputs["basepath"], "/site/")
+            self.assertEqual(len(inputs[source]), 64)
+            self.assertTrue(static_inputs(source)[source].startswith("6:"))
+
+    def test_asset_inputs(self):
+        images = {"/images/a.png": {"src": "/images/a.0123456789.png"}}
+        inputs = asset_inputs(["/images/a.png", "/images/b.png"], images)
+        self.assertEqual(sorted(inputs), ["asset:/images/a.png", "asset:/images/b.png"])
+        self.assertNotEqual(
+            inputs["asset:/images/a.png"], inputs["asset:/images/b.png"]
+        )
+        self.graph.add("docs/c/index.html", {"c.md": "3", **inputs})
+        self.assertEqual(
+            self.graph.asset_urls("docs/c/index.html"),
+            ["/images/a.png", "/images/b.png"],
+        )
+        self.assertEqual(self.graph.asset_urls("docs/a/index.html"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
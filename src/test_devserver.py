@@ -0,0 +1,83 @@
+import os
+import unittest
+from unittest import mock
+
+from devserver import SiteWatcher, scan_files
+from fixtures import SiteTestCase, read_file, write_file
+from generate_page import generate_pages
+
+
+class TestSiteWatcher(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        write_file(os.path.join(self.static, "index.css"), "body {}")
+        write_file(os.path.join(self.content, "index.md"), "# Home")
+        write_file(os.path.join(self.content, "blog", "index.md"), "# Blog")
+        write_file(self.template, "{{ Title }}|{{ Content }}")
+        self.watcher = SiteWatcher(self.static, self.content, self.template, self.dest)
+
+    def test_scan_files_filters_suffix(self):
+        write_file(os.path.join(self.content, "notes.txt"), "ignored")
+        self.assertEqual(
+            sorted(scan_files(self.content, ".md")),
+            [
+                os.path.join(self.content, "blog", "index.md"),
+                os.path.join(self.content, "index.md"),
+            ],
+        )
+
+    def test_poll_without_changes(self):
+        with self.assertNoLogs(level="INFO"):
+            self.assertEqual(self.watcher.poll(), [])
+
+    def test_changed_page_is_rendered_alone(self):
+        write_file(os.path.join(self.content, "blog", "index.md"), "# Blog posts")
+        with self.assertLogs("generate_page", "INFO") as logs:
+            changed = self.watcher.poll()
+        self.assertEqual(changed, [os.path.join(self.content, "blog", "index.md")])
+        self.assertEqual(len(logs.output), 1)
+        self.assertEqual(
+            read_file(os.path.join(self.dest, "blog", "index.html")),
+            "Blog posts|<div><h1>Blog posts</h1></div>",
+        )
+
+    def test_template_change_renders_every_page(self):
+        write_file(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        with self.assertLogs("generate_page", "INFO") as logs:
+            changed = self.watcher.poll()
+        self.assertEqual(changed, [self.template])
+        self.assertEqual(len(logs.output), 2)
+        self.assertTrue(
+            read_file(os.path.join(self.dest, "index.html")).startswith("<title>")
+        )
+
+    def test_rebuild_reuses_the_compiled_template(self):
+        with mock.patch("devserver.generate_pages", wraps=generate_pages) as render:
+            self.watcher.rebuild_pages()
+        self.assertIs(render.call_args.kwargs["template"], self.watcher.template)
+        self.assertEqual(
+            read_file(os.path.join(self.dest, "index.html")),
+            "Home|<div><h1>Home</h1></div>",
+        )
+
+    def test_static_changes_are_copied_and_removed(self):
+        source = os.path.join(self.static, "images", "a.png")
+        write_file(source, "png")
+        self.watcher.poll()
+        destination = os.path.join(self.dest, "images", "a.png")
+        self.assertEqual(read_file(destination), "png")
+        self.assertEqual(os.stat(destination).st_mtime_ns, os.stat(source).st_mtime_ns)
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        self.watcher.poll()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+
+    def test_deleted_page_is_removed(self):
+        self.watcher.rebuild_pages()
+        os.remove(os.path.join(self.content, "blog", "index.md"))
+        self.watcher.poll()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import json
+import os
+import unittest
+
+from fingerprint import fingerprint_assets
+from fixtures import SiteTestCase, write_file
+from manifest import hash_file
+
+
+class TestFingerprintAssets(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.state = os.path.join(self.root, ".build", "assets.json")
+        write_file(os.path.join(self.static, "index.css"), "body {}")
+        write_file(os.path.join(self.static, "js", "app.js"), "run()")
+
+    def fingerprint(self):
+        return fingerprint_assets(self.static, self.dest, self.state)
+
+    def test_writes_hashed_copies_and_manifest(self):
+        build = self.fingerprint()
+        digest = hash_file(os.path.join(self.static, "index.css"))[:10]
+        self.assertEqual(build.assets["/index.css"], f"/index.{digest}.css")
+        self.assertTrue(os.path.exists(os.path.join(self.dest, f"index.{digest}.css")))
+        self.assertTrue(build.assets["/js/app.js"].startswith("/js/app."))
+        with open(build.manifest_path) as f:
+            self.assertEqual(json.load(f), build.assets)
+
+    def test_unchanged_assets_keep_their_names(self):
+        first = self.fingerprint()
+        second = self.fingerprint()
+        self.assertEqual(second.assets, first.assets)
+        self.assertEqual((second.hashed, second.reused), (0, 2))
+
+    def test_changed_asset_replaces_stale_output(self):
+        first = self.fingerprint()
+        write_file(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        second = self.fingerprint()
+        self.assertNotEqual(second.assets["/index.css"], first.assets["/index.css"])
+        self.assertEqual(second.assets["/js/app.js"], first.assets["/js/app.js"])
+        old = os.path.join(self.dest, first.assets["/index.css"][1:])
+        new = os.path.join(self.dest, second.assets["/index.css"][1:])
+        self.assertFalse(os.path.exists(old))
+        self.assertTrue(os.path.exists(new))
+
+
+if __name__ == "__main__":
+    unittest.main()
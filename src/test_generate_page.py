@@ -1,6 +1,10 @@
+import os
 import unittest
 
-from generate_page import extract_title
+from fixtures import SiteTestCase, write_file
+from generate_page import collect_pages, extract_title, generate_pages
+from search import SearchIndex
+from template import Template
 
 
 class TestWebPage(unittest.TestCase):
@@ -20,5 +24,78 @@ class TestWebPage(unittest.TestCase):
             extract_title(markdown)
 
 
+class TestGeneratePages(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        write_file(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        for name, markdown in [
+            ("a", "# Page A"),
+            ("b", "# Page B with `unmatched code"),
+            ("c", "# Page C"),
+        ]:
+            write_file(os.path.join(self.content, name, "index.md"), markdown)
+
+    def assert_failure_isolated(self, jobs):
+        pages = collect_pages(self.content, self.dest)
+        failures, changed = generate_pages(pages, self.template, "/", jobs)
+        self.assertEqual(
+            changed,
+            [os.path.join(self.dest, name, "index.html") for name in ["a", "c"]],
+        )
+        self.assertEqual(len(failures), 1)
+        self.assertEqual(failures[0][0], os.path.join(self.content, "b", "index.md"))
+        self.assertIn("Unmatched delimiter", failures[0][1])
+        for name in ["a", "c"]:
+            self.assertTrue(os.path.exists(os.path.join(self.dest, name, "index.html")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "b", "index.html")))
+
+    def test_collect_pages(self):
+        pages = sorted(collect_pages(self.content, self.dest))
+        self.assertEqual(
+            pages,
+            [
+                (
+                    os.path.join(self.content, name, "index.md"),
+                    os.path.join(self.dest, name),
+                )
+                for name in ["a", "b", "c"]
+            ],
+        )
+
+    def test_generate_pages_serial(self):
+        self.assert_failure_isolated(1)
+
+    def test_generate_pages_parallel(self):
+        self.assert_failure_isolated(2)
+
+    def test_generate_pages_with_mmap_threshold(self):
+        pages = collect_pages(self.content, self.dest)
+        generate_pages(pages, self.template, "/", 1)
+        failures, changed = generate_pages(
+            pages, self.template, "/", 1, mmap_threshold=1
+        )
+        self.assertEqual(len(failures), 1)
+        self.assertEqual(changed, [])
+
+    def test_generate_pages_with_compiled_template(self):
+        pages = collect_pages(self.content, self.dest)
+        template = Template("<main>{{ Title }}</main>")
+        generate_pages(pages, self.template, "/", 1, template=template)
+        with open(os.path.join(self.dest, "a", "index.html")) as f:
+            self.assertEqual(f.read(), "<main>Page A</main>")
+
+    def test_generate_pages_collects_search_terms(self):
+        search = SearchIndex({os.path.join(self.content, "b", "index.md"): {}})
+        pages = collect_pages(self.content, self.dest)
+        generate_pages(pages, self.template, "/", 2, collectors=[search])
+        self.assertEqual(
+            sorted(search.pages),
+            [os.path.join(self.content, name, "index.md") for name in ["a", "c"]],
+        )
+        entry = search.pages[os.path.join(self.content, "a", "index.md")]
+        self.assertEqual(entry["title"], "Page A")
+        self.assertEqual(entry["terms"], {"page": [0], "a": [1]})
+
+
 if __name__ == "__main__":
     unittest.main()
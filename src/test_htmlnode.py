@@ -1,8 +1,14 @@
+import io
 import unittest
 
 from htmlnode import HTMLNode, LeafNode, ParentNode
 
 
+class FragmentList(list):
+    def write(self, fragment):
+        self.append(fragment)
+
+
 class TestHTMLNode(unittest.TestCase):
     def test_to_html(self):
         node = HTMLNode("div", "Hello, World!", None, {"class": "greeting"})
@@ -90,6 +96,28 @@ class TestHTMLNode(unittest.TestCase):
             '<div class="container"><span>child</span></div>',
         )
 
+    def test_write_html_streams_fragments(self):
+        grandchild_node = LeafNode(tag="b", value="grandchild")
+        child_node = ParentNode("span", [grandchild_node, LeafNode("text")])
+        parent_node = ParentNode("div", [child_node], {"class": "container"})
+        fragments = FragmentList()
+        parent_node.write_html(fragments)
+        self.assertEqual(
+            fragments,
+            [
+                '<div class="container">',
+                "<span>",
+                "<b>grandchild</b>",
+                "text",
+                "</span>",
+                "</div>",
+            ],
+        )
+
+    def test_write_html_with_no_children(self):
+        parent_node = ParentNode("div", [])
+        self.assertRaises(ValueError, parent_node.write_html, io.StringIO())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,146 @@
+import os
+import struct
+import unittest
+import zlib
+from unittest import mock
+
+from fixtures import SiteTestCase, write_file
+from images import (
+    Image,
+    hashed_name,
+    image_size,
+    process_images,
+)
+from markdown_blocks import markdown_to_html_node, parse_markdown
+from template import rewrite_basepath
+
+
+def png_bytes(width, height):
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    rows = b"".join(b"\x00" + b"\x80\x80\x80" * width for _ in range(height))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(rows))
+        + chunk(b"IEND", b"")
+    )
+
+
+def jpeg_bytes(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    sof = b"\xff\xc0" + struct.pack(">HBHHB", 11, 8, height, width, 1) + b"\x01\x11\x00"
+    return b"\xff\xd8" + app0 + sof + b"\xff\xd9"
+
+
+class TestImageSize(SiteTestCase):
+    def size_of(self, name, data):
+        path = os.path.join(self.root, name)
+        write_file(path, data)
+        return image_size(path)
+
+    def test_formats(self):
+        self.assertEqual(self.size_of("a.png", png_bytes(40, 20)), (40, 20))
+        self.assertEqual(self.size_of("a.jpg", jpeg_bytes(640, 480)), (640, 480))
+        gif = b"GIF89a" + struct.pack("<HH", 300, 200) + b"\x00" * 10
+        self.assertEqual(self.size_of("a.gif", gif), (300, 200))
+        webp = (
+            b"RIFF\x00\x00\x00\x00WEBPVP8X"
+            + b"\x00" * 8
+            + (799).to_bytes(3, "little")
+            + (599).to_bytes(3, "little")
+        )
+        self.assertEqual(self.size_of("a.webp", webp), (800, 600))
+        self.assertIsNone(self.size_of("a.txt", b"not an image"))
+
+    def test_hashed_name(self):
+        self.assertEqual(
+            hashed_name("/images/a.png", "0123456789abcdef"), "/images/a.0123456789.png"
+        )
+        self.assertEqual(
+            hashed_name("/images/a.png", "0123456789abcdef", "-480w"),
+            "/images/a.0123456789-480w.png",
+        )
+
+
+class TestProcessImages(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = os.path.join(self.root, ".build", "images")
+        write_file(os.path.join(self.static, "images", "a.png"), png_bytes(64, 32))
+        write_file(os.path.join(self.static, "index.css"), b"body {}")
+
+    def process(self, widths=(16, 128)):
+        return process_images(self.static, self.dest, self.cache, widths)
+
+    def test_assets_and_cache_reuse(self):
+        build = self.process()
+        asset = build.assets["/images/a.png"]
+        self.assertEqual((asset["width"], asset["height"]), (64, 32))
+        self.assertRegex(asset["src"], r"^/images/a\.[0-9a-f]{10}\.png$")
+        self.assertEqual(build.processed, 1)
+        for output in build.outputs:
+            self.assertTrue(os.path.exists(output))
+        again = self.process()
+        self.assertEqual((again.processed, again.reused), (0, 1))
+        self.assertEqual(again.assets, build.assets)
+
+    def test_unchanged_images_are_not_rehashed(self):
+        self.process()
+        with mock.patch("manifest.hash_file") as hash_file:
+            again = self.process()
+        hash_file.assert_not_called()
+        self.assertEqual((again.processed, again.reused), (0, 1))
+
+    def test_changed_image_replaces_outputs(self):
+        first = self.process()
+        write_file(os.path.join(self.static, "images", "a.png"), png_bytes(32, 32))
+        second = self.process()
+        self.assertEqual(second.processed, 1)
+        self.assertNotEqual(second.outputs, first.outputs)
+        for output in first.outputs:
+            self.assertFalse(os.path.exists(output))
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_variants(self):
+        build = self.process()
+        asset = build.assets["/images/a.png"]
+        variant = hashed_name("/images/a.png", asset["src"].split(".")[1], "-16w")
+        self.assertEqual(asset["srcset"], f"{variant} 16w, {asset['src']} 64w")
+        self.assertEqual(len(build.outputs), 2)
+        with Image.open(build.outputs[1]) as image:
+            self.assertEqual(image.size, (16, 8))
+
+
+class TestImageRendering(unittest.TestCase):
+    def test_image_nodes_use_asset_index(self):
+        images = {
+            "/images/a.png": {
+                "src": "/images/a.0123456789.png",
+                "width": 64,
+                "height": 32,
+                "srcset": "/images/a.0123456789-16w.png 16w, /images/a.0123456789.png 64w",
+            }
+        }
+        html = markdown_to_html_node("![A](/images/a.png) ![B](/b.png)").to_html()
+        self.assertIn('<img src="/images/a.png" alt="A">', html)
+        node, _ = parse_markdown("![A](/images/a.png) ![B](/b.png)", images=images)
+        html = node.to_html()
+        self.assertIn(
+            '<img src="/images/a.0123456789.png" alt="A" width="64" height="32" '
+            'srcset="/images/a.0123456789-16w.png 16w, /images/a.0123456789.png 64w">',
+            html,
+        )
+        self.assertIn('<img src="/b.png" alt="B">', html)
+        self.assertIn(
+            'srcset="/site/images/a.0123456789-16w.png 16w, '
+            '/site/images/a.0123456789.png 64w"',
+            rewrite_basepath(html, "/site/"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
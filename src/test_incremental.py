@@ -0,0 +1,181 @@
+import os
+import unittest
+
+from fixtures import TEMPLATE, SiteTestCase, write_file
+from incremental import build_incrementally
+from linkcheck import LinkIndex
+
+
+class TestBuildIncrementally(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manifest = os.path.join(self.root, ".build", "manifest.json")
+        write_file(os.path.join(self.static, "index.css"), "body {}")
+        write_file(os.path.join(self.content, "index.md"), "# Home")
+        write_file(os.path.join(self.content, "blog", "post", "index.md"), "# Post")
+        write_file(self.template, TEMPLATE)
+
+    def build(self, basepath="/", collectors=(), images=None, assets=None):
+        return build_incrementally(
+            self.static,
+            self.content,
+            self.template,
+            self.dest,
+            basepath,
+            self.manifest,
+            collectors=collectors,
+            images=images,
+            assets=assets,
+        )
+
+    def test_first_build_renders_everything(self):
+        summary = self.build()
+        self.assertEqual(summary.pages_rendered, 2)
+        self.assertEqual(summary.static_copied, 1)
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.css")))
+        self.assertTrue(
+            os.path.exists(os.path.join(self.dest, "blog", "post", "index.html"))
+        )
+
+    def test_unchanged_build_skips_everything(self):
+        self.build()
+        summary = self.build()
+        self.assertEqual(summary.pages_rendered, 0)
+        self.assertEqual(summary.pages_skipped, 2)
+        self.assertEqual(summary.static_copied, 0)
+        self.assertEqual(summary.static_skipped, 1)
+
+    def test_copy_jobs_sync_static_files_in_threads(self):
+        write_file(os.path.join(self.static, "js", "app.js"), "run()")
+        summary = build_incrementally(
+            self.static,
+            self.content,
+            self.template,
+            self.dest,
+            manifest_path=self.manifest,
+            copy_jobs=4,
+        )
+        self.assertEqual(summary.static_copied, 2)
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "js", "app.js")))
+
+    def test_pipeline_renders_only_changed_pages(self):
+        self.build()
+        write_file(os.path.join(self.content, "blog", "post", "index.md"), "# Edited")
+        summary = build_incrementally(
+            self.static,
+            self.content,
+            self.template,
+            self.dest,
+            manifest_path=self.manifest,
+            pipeline=True,
+        )
+        output = os.path.join(self.dest, "blog", "post", "index.html")
+        self.assertEqual(summary.pages_rendered, 1)
+        self.assertEqual(summary.pages_changed, [output])
+        with open(output) as f:
+            self.assertIn("<h1>Edited</h1>", f.read())
+
+    def test_changed_page_is_rerendered(self):
+        self.build()
+        write_file(os.path.join(self.content, "blog", "post", "index.md"), "# Edited")
+        summary = self.build()
+        self.assertEqual(summary.pages_rendered, 1)
+        output = os.path.join(self.dest, "blog", "post", "index.html")
+        source = os.path.join(self.content, "blog", "post", "index.md")
+        self.assertEqual(summary.reasons, {output: [f"{source} changed"]})
+        with open(output) as f:
+            self.assertIn("<h1>Edited</h1>", f.read())
+
+    def test_template_or_basepath_change_rerenders_all_pages(self):
+        self.build()
+        write_file(self.template, "<main>" + TEMPLATE + "</main>")
+        summary = self.build()
+        self.assertEqual(summary.pages_rendered, 2)
+        for reasons in summary.reasons.values():
+            self.assertEqual(reasons, [f"{self.template} changed"])
+        summary = self.build("/site/")
+        self.assertEqual(summary.pages_rendered, 2)
+        for reasons in summary.reasons.values():
+            self.assertEqual(reasons, ["basepath changed"])
+
+    def test_deleted_sources_remove_outputs(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post", "index.md"))
+        os.remove(os.path.join(self.static, "index.css"))
+        summary = self.build()
+        self.assertEqual(summary.pages_removed, 1)
+        self.assertEqual(summary.static_removed, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_missing_output_is_regenerated(self):
+        self.build()
+        os.remove(os.path.join(self.dest, "index.html"))
+        summary = self.build()
+        self.assertEqual(summary.pages_rendered, 1)
+        self.assertEqual(
+            summary.reasons,
+            {os.path.join(self.dest, "index.html"): ["output is missing"]},
+        )
+
+    def test_failed_page_is_retried(self):
+        write_file(os.path.join(self.content, "index.md"), "no title")
+        self.assertEqual(len(self.build().failures), 1)
+        summary = self.build()
+        self.assertEqual(len(summary.failures), 1)
+        self.assertEqual(
+            summary.reasons,
+            {os.path.join(self.dest, "index.html"): ["no previous build recorded"]},
+        )
+
+    def test_pages_missing_from_a_collector_are_rerendered(self):
+        self.build()
+        links = LinkIndex()
+        summary = self.build(collectors=[links])
+        self.assertEqual(summary.pages_rendered, 2)
+        for reasons in summary.reasons.values():
+            self.assertEqual(reasons, ["missing from the link index"])
+        self.assertEqual(len(links), 2)
+        self.assertEqual(self.build(collectors=[links]).pages_rendered, 0)
+        os.remove(os.path.join(self.content, "index.md"))
+        self.build(collectors=[links])
+        self.assertEqual(len(links), 1)
+
+    def test_images_only_rerender_pages_that_reference_them(self):
+        post = os.path.join(self.content, "blog", "post", "index.md")
+        write_file(post, "# Post\n\n![A](/images/a.png)")
+        images = {"/images/a.png": {"src": "/images/a.0123456789.png"}}
+        self.assertEqual(self.build(images=images).pages_rendered, 2)
+        images["/images/b.png"] = {"src": "/images/b.0123456789.png"}
+        self.assertEqual(self.build(images=images).pages_rendered, 0)
+        images["/images/a.png"] = {"src": "/images/a.9876543210.png"}
+        summary = self.build(images=images)
+        output = os.path.join(self.dest, "blog", "post", "index.html")
+        self.assertEqual(summary.reasons, {output: ["asset:/images/a.png changed"]})
+        with open(output) as f:
+            self.assertIn("/images/a.9876543210.png", f.read())
+
+    def test_assets_only_rerender_pages_that_reference_them(self):
+        write_file(self.template, '<link href="/index.css">' + TEMPLATE)
+        post = os.path.join(self.content, "blog", "post", "index.md")
+        write_file(post, "# Post\n\n[Notes](/notes.txt)")
+        assets = {"/index.css": "/index.0123456789.css", "/notes.txt": "/notes.1.txt"}
+        self.assertEqual(self.build(assets=assets).pages_rendered, 2)
+        assets["/unused.txt"] = "/unused.0123456789.txt"
+        self.assertEqual(self.build(assets=assets).pages_rendered, 0)
+        assets["/notes.txt"] = "/notes.2.txt"
+        summary = self.build(assets=assets)
+        output = os.path.join(self.dest, "blog", "post", "index.html")
+        self.assertEqual(summary.reasons, {output: ["asset:/notes.txt changed"]})
+        with open(output) as f:
+            self.assertIn('href="/notes.2.txt"', f.read())
+        assets["/index.css"] = "/index.9876543210.css"
+        summary = self.build(assets=assets)
+        self.assertEqual(summary.pages_rendered, 2)
+        for reasons in summary.reasons.values():
+            self.assertEqual(reasons, ["asset:/index.css changed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
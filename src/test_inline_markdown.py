@@ -168,6 +168,47 @@ class TestSplitNodesDelimiter(unittest.TestCase):
         nodes = text_to_textnodes(text)
         self.assertListEqual(expected_nodes, nodes)
 
+    def test_text_to_textnodes_underscores_split_before_links(self):
+        text = "See [the docs](https://example.com/some_page) and ![a](/images/a_b.png)"
+        expected_nodes = [
+            TextNode("See [the docs](https://example.com/some", TextType.TEXT),
+            TextNode("page) and ![a](/images/a", TextType.ITALIC),
+            TextNode("b.png)", TextType.TEXT),
+        ]
+        self.assertListEqual(expected_nodes, text_to_textnodes(text))
+
+    def test_text_to_textnodes_bracket_before_image(self):
+        expected_nodes = [
+            TextNode("Step [1]: ", TextType.TEXT),
+            TextNode("s", TextType.IMAGE, "/images/s.png"),
+        ]
+        self.assertListEqual(
+            expected_nodes, text_to_textnodes("Step [1]: ![s](/images/s.png)")
+        )
+
+    def test_text_to_textnodes_bracket_before_code(self):
+        expected_nodes = [
+            TextNode("The [draft] label, then ", TextType.TEXT),
+            TextNode("cfg[key](x)", TextType.CODE),
+        ]
+        self.assertListEqual(
+            expected_nodes, text_to_textnodes("The [draft] label, then `cfg[key](x)`")
+        )
+
+    def test_text_to_textnodes_code_keeps_delimiters(self):
+        text = "Use `snake_case` or `**kwargs`"
+        expected_nodes = [
+            TextNode("Use ", TextType.TEXT),
+            TextNode("snake_case", TextType.CODE),
+            TextNode(" or ", TextType.TEXT),
+            TextNode("**kwargs", TextType.CODE),
+        ]
+        self.assertListEqual(expected_nodes, text_to_textnodes(text))
+
+    def test_text_to_textnodes_unmatched_delimiter(self):
+        self.assertRaises(Exception, text_to_textnodes, "This is **bold text")
+        self.assertRaises(Exception, text_to_textnodes, "This is `code text")
+
 
 if __name__ == "__main__":
     unittest.main()
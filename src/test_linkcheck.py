@@ -0,0 +1,58 @@
+import unittest
+
+from linkcheck import LinkIndex, site_path, target_exists
+from markdown_blocks import parse_markdown
+from pagetext import PageText
+
+FILES = {"index.html", "blog/a/index.html", "blog/b/index.html", "images/a.png"}
+
+
+def page_text(markdown):
+    text = PageText()
+    parse_markdown(markdown, sink=text.text_nodes)
+    return text
+
+
+class TestLinkCheck(unittest.TestCase):
+    def test_site_path(self):
+        base = "/site/blog/a/"
+        self.assertEqual(site_path("/blog/b", base, "/site/"), "blog/b")
+        self.assertEqual(site_path("../b/", base, "/site/"), "blog/b/")
+        self.assertEqual(
+            site_path("/images/a%20b.png", base, "/site/"), "images/a b.png"
+        )
+        self.assertEqual(site_path("/", base, "/site/"), "")
+        self.assertEqual(site_path("../../../x", base, "/site/"), "/x")
+        for url in ["https://example.com/", "//cdn.example.com/a.js", "#top", ""]:
+            self.assertIsNone(site_path(url, base, "/site/"))
+
+    def test_target_exists(self):
+        self.assertTrue(target_exists("", FILES))
+        self.assertTrue(target_exists("blog/a", FILES))
+        self.assertTrue(target_exists("blog/a/", FILES))
+        self.assertTrue(target_exists("images/a.png", FILES))
+        self.assertFalse(target_exists("blog", FILES))
+        self.assertFalse(target_exists("images/a.png/", FILES))
+
+    def test_check_reports_dangling_targets(self):
+        links = LinkIndex()
+        links.add(
+            "content/blog/a/index.md",
+            "docs/blog/a/index.html",
+            page_text(
+                "# A\n\n[b](../b) [home](/) [gone](/blog/c) "
+                "[ext](https://example.com) ![img](/images/a.png) ![](/images/x.png)"
+            ),
+        )
+        self.assertEqual(links.link_count(), 6)
+        self.assertEqual(
+            links.check(FILES, "docs", "/site/"),
+            [
+                ("content/blog/a/index.md", "/blog/c"),
+                ("content/blog/a/index.md", "/images/x.png"),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
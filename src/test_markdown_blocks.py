@@ -1,10 +1,19 @@
+import io
+import os
+import tempfile
 import unittest
 
 from markdown_blocks import (
     BlockType,
+    PageMetadata,
     block_to_block_type,
+    create_html_node,
+    iter_buffer_blocks,
+    iter_markdown_blocks,
     markdown_to_blocks,
     markdown_to_html_node,
+    parse_markdown,
+    read_markdown_blocks,
 )
 
 
@@ -34,6 +43,48 @@ This is the same paragraph on a new line
         blocks = markdown_to_blocks(md)
         self.assertEqual(blocks, [])
 
+    def test_markdown_to_blocks_keeps_fenced_code_intact(self):
+        md = "Intro\n\n```\nfirst line\n\nafter blank\n```\n\nOutro"
+        blocks = markdown_to_blocks(md)
+        self.assertEqual(
+            blocks, ["Intro", "```\nfirst line\n\nafter blank\n```", "Outro"]
+        )
+
+    def test_iter_markdown_blocks_from_file_lines(self):
+        lines = io.StringIO("# Title\n\nSome text\nmore text\n\n\n- item\n")
+        self.assertEqual(
+            list(iter_markdown_blocks(lines)),
+            ["# Title", "Some text\nmore text", "- item"],
+        )
+
+    def test_read_markdown_blocks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.md")
+            with open(path, "w") as f:
+                f.write("# Title\n\n```\ncode\n\nmore code\n```\n")
+            node = markdown_to_html_node(read_markdown_blocks(path))
+        self.assertEqual(
+            node.to_html(),
+            "<div><h1>Title</h1><pre><code>code\n\nmore code\n</code></pre></div>",
+        )
+
+    def test_iter_buffer_blocks_matches_text_path(self):
+        text = "\n# Título\r\n\r\n```\r\ncode\r\n\r\n\r\nmore\r\n```\n\n \n- a\n- b\n"
+        self.assertEqual(
+            list(iter_buffer_blocks(text.encode("utf-8"))),
+            list(iter_markdown_blocks(io.StringIO(text, newline=None))),
+        )
+
+    def test_read_markdown_blocks_with_mmap(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.md")
+            with open(path, "w") as f:
+                f.write("# Title\n\n```\ncode\n\nmore code\n```\n\ntext\n")
+            self.assertEqual(
+                list(read_markdown_blocks(path, mmap_threshold=0)),
+                list(read_markdown_blocks(path)),
+            )
+
     def test_block_to_heading(self):
         md = "# This is a heading"
         block_type = block_to_block_type(md)
@@ -79,6 +130,19 @@ This is the same paragraph on a new line
         block_type = block_to_block_type(md)
         self.assertEqual(block_type, BlockType.PARAGRAPH)
 
+    def test_block_to_invalid_code(self):
+        md = "```python\nprint('unterminated')"
+        block_type = block_to_block_type(md)
+        self.assertEqual(block_type, BlockType.PARAGRAPH)
+
+    def test_block_to_invalid_ordered_list(self):
+        md = "1.Item 1"
+        block_type = block_to_block_type(md)
+        self.assertEqual(block_type, BlockType.PARAGRAPH)
+
+    def test_create_html_node_unknown_type(self):
+        self.assertRaises(ValueError, create_html_node, "text", "unknown")
+
     def test_paragraph(self):
         md = """
     This is **bolded** paragraph
@@ -247,6 +311,34 @@ this is paragraph text
         )
         self.assertEqual(html, expected_html)
 
+    def test_heading_with_hash_in_text(self):
+        node = markdown_to_html_node("## Writing C# code")
+        self.assertEqual(node.to_html(), "<div><h2>Writing C# code</h2></div>")
+
+
+class TestParseMarkdown(unittest.TestCase):
+    def test_title_and_outline(self):
+        md = "## Intro\n\n# Title\n\ntext\n\n### Part\n\n# Second"
+        node, metadata = parse_markdown(md)
+        self.assertEqual(node.to_html(), markdown_to_html_node(md).to_html())
+        self.assertEqual(metadata.title, "Title")
+        self.assertEqual(
+            metadata.outline,
+            [(2, "Intro"), (1, "Title"), (3, "Part"), (1, "Second")],
+        )
+
+    def test_heading_inside_code_is_not_a_title(self):
+        _, metadata = parse_markdown("```\n# not a title\n```\n\n# Real")
+        self.assertEqual(metadata, PageMetadata("Real", [(1, "Real")]))
+
+    def test_no_title(self):
+        _, metadata = parse_markdown("text\n\n## Sub")
+        self.assertIsNone(metadata.title)
+
+    def test_metadata_compares_unequal_to_other_types(self):
+        self.assertNotEqual(PageMetadata("Title"), None)
+        self.assertNotEqual(PageMetadata("Title"), "Title")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from output import OutputFile, write_if_changed
+
+
+class TestOutputFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "index.html")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_write_new_file(self):
+        self.assertTrue(write_if_changed(self.path, "<p>a</p>"))
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "<p>a</p>")
+
+    def test_identical_contents_leave_file_untouched(self):
+        write_if_changed(self.path, "<p>a</p>")
+        os.utime(self.path, ns=(0, 0))
+        self.assertFalse(write_if_changed(self.path, "<p>a</p>"))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 0)
+        self.assertEqual(os.listdir(self.tmp.name), ["index.html"])
+
+    def test_changed_contents_replace_file(self):
+        write_if_changed(self.path, "<p>a</p>")
+        self.assertTrue(write_if_changed(self.path, "<p>b</p>"))
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "<p>b</p>")
+
+    def stream(self, *parts):
+        with OutputFile(self.path) as out:
+            for part in parts:
+                out.write(part)
+        return out.changed
+
+    def test_identical_stream_is_never_written(self):
+        self.stream("<p>", "a", "</p>")
+        os.utime(self.path, ns=(0, 0))
+        with mock.patch("builtins.open", wraps=open) as opened:
+            self.assertFalse(self.stream("<p>", "a", "</p>"))
+        self.assertEqual([call.args[1] for call in opened.call_args_list], ["rb"])
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 0)
+
+    def test_stream_diverging_midway_keeps_matched_prefix(self):
+        self.stream("<p>", "a", "</p>")
+        self.assertTrue(self.stream("<p>", "é", "</p>", "<p>c</p>"))
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "<p>é</p><p>c</p>")
+        self.assertEqual(os.listdir(self.tmp.name), ["index.html"])
+
+    def test_shorter_stream_truncates_file(self):
+        self.stream("<p>a</p>", "<p>b</p>")
+        self.assertTrue(self.stream("<p>a</p>"))
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "<p>a</p>")
+
+    def test_identical_text_is_not_rewritten(self):
+        write_if_changed(self.path, "<p>é</p>")
+        with mock.patch("builtins.open", wraps=open) as opened:
+            self.assertFalse(write_if_changed(self.path, "<p>é</p>"))
+        self.assertEqual([call.args[1] for call in opened.call_args_list], ["rb"])
+
+    def test_error_keeps_previous_output(self):
+        write_if_changed(self.path, "<p>a</p>")
+        with self.assertRaises(RuntimeError):
+            with OutputFile(self.path) as out:
+                out.write("<p>partial")
+                raise RuntimeError("render failed")
+        self.assertFalse(out.changed)
+        self.assertEqual(os.listdir(self.tmp.name), ["index.html"])
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "<p>a</p>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from markdown_blocks import markdown_to_html_node
+from parse_cache import ParseCache
+
+MARKDOWN = "# Title\n\nSome **bold** text\n\n- one\n- two"
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache", "parse.sqlite3")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_get_missing_block(self):
+        with ParseCache(self.path) as cache:
+            self.assertIsNone(cache.get("text"))
+            self.assertEqual(cache.misses, 1)
+
+    def test_put_persists_after_close(self):
+        with ParseCache(self.path) as cache:
+            cache.put("text", "<p>text</p>")
+        with ParseCache(self.path) as cache:
+            self.assertEqual(cache.get("text"), "<p>text</p>")
+            self.assertEqual(cache.hits, 1)
+
+    def test_parser_version_is_part_of_key(self):
+        with ParseCache(self.path, "1") as cache:
+            cache.put("text", "<p>text</p>")
+        with ParseCache(self.path, "2") as cache:
+            self.assertIsNone(cache.get("text"))
+
+    def test_evict_least_recently_used(self):
+        with ParseCache(self.path) as cache:
+            cache.put("old", "x" * 10)
+            cache.flush()
+            cache.put("new", "y" * 10)
+            cache.flush()
+            cache.get("old")
+            cache.flush()
+            self.assertEqual(cache.evict(15), 1)
+            self.assertEqual(cache.size(), 10)
+            self.assertIsNone(cache.get("new"))
+            self.assertEqual(cache.get("old"), "x" * 10)
+
+    def test_markdown_to_html_node_with_cache(self):
+        expected = markdown_to_html_node(MARKDOWN).to_html()
+        with ParseCache(self.path) as cache:
+            self.assertEqual(markdown_to_html_node(MARKDOWN, cache).to_html(), expected)
+            self.assertEqual(cache.misses, 3)
+        with ParseCache(self.path) as cache:
+            self.assertEqual(markdown_to_html_node(MARKDOWN, cache).to_html(), expected)
+            self.assertEqual(cache.hits, 3)
+            self.assertEqual(cache.misses, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import unittest
+
+from fixtures import SiteTestCase, write_file
+from generate_page import collect_pages, generate_pages_recursively
+from pipeline import generate_pages_pipelined
+
+
+def read_tree(root):
+    files = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            with open(path) as f:
+                files[os.path.relpath(path, root)] = f.read()
+    return files
+
+
+class TestGeneratePagesPipelined(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        write_file(self.template, '<link href="/a.css">{{ Title }}{{ Content }}')
+        for index in range(20):
+            write_file(
+                os.path.join(self.content, f"page{index}", "index.md"),
+                f"# Page {index}\n\nLink to [home](/) and `code`\n\n- item {index}",
+            )
+
+    def test_output_matches_serial_build(self):
+        serial = os.path.join(self.root, "serial")
+        pipelined = os.path.join(self.root, "pipelined")
+        generate_pages_recursively(self.content, self.template, serial, "/site/")
+        pages = collect_pages(self.content, pipelined)
+        failures, changed = generate_pages_pipelined(
+            pages, self.template, "/site/", queue_size=2
+        )
+        self.assertEqual(failures, [])
+        self.assertEqual(len(changed), 20)
+        self.assertEqual(read_tree(pipelined), read_tree(serial))
+
+    def test_failures_are_reported_in_page_order(self):
+        write_file(os.path.join(self.content, "page3", "index.md"), "no title")
+        write_file(os.path.join(self.content, "page1", "index.md"), "`unmatched")
+        failures, _ = generate_pages_pipelined(
+            collect_pages(self.content, self.dest), self.template
+        )
+        self.assertEqual(
+            [from_path for from_path, _ in failures],
+            [
+                os.path.join(self.content, "page1", "index.md"),
+                os.path.join(self.content, "page3", "index.md"),
+            ],
+        )
+        self.assertEqual(len(os.listdir(self.dest)), 18)
+
+
+if __name__ == "__main__":
+    unittest.main()
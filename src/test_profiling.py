@@ -0,0 +1,78 @@
+import json
+import os
+import unittest
+
+from fixtures import SiteTestCase, write_file
+from generate_page import generate_page
+from profiling import STAGES, BuildProfile, profile_build
+
+
+class TestBuildProfile(unittest.TestCase):
+    def test_slowest_pages(self):
+        profile = BuildProfile()
+        profile.add("file_read", 0.5, "a.md")
+        profile.add("write", 2.0, "b.md")
+        profile.add("file_read", 1.0, "c.md")
+        profile.add("static_copy", 3.0)
+        self.assertEqual(
+            [page["path"] for page in profile.slowest_pages(2)], ["b.md", "c.md"]
+        )
+        report = profile.report()
+        self.assertEqual(report["page_count"], 3)
+        self.assertEqual(report["total_seconds"], 6.5)
+        self.assertEqual(report["stages"]["static_copy"], 3.0)
+
+
+class TestProfileBuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        write_file(os.path.join(self.static, "index.css"), "body {}")
+        write_file(
+            os.path.join(self.content, "index.md"),
+            "# Home\n\nSee [the blog](/blog)\n\n- one\n- two",
+        )
+        write_file(os.path.join(self.content, "blog", "index.md"), "# Blog")
+        write_file(self.template, '<link href="/index.css">{{ Title }}{{ Content }}')
+
+    def test_profile_build(self):
+        profile, failures, changed = profile_build(
+            self.static, self.content, self.template, self.dest, "/site/"
+        )
+        self.assertEqual(failures, [])
+        self.assertEqual(len(changed), 2)
+        self.assertEqual(set(profile.stages), set(STAGES))
+        self.assertEqual(len(profile.pages), 2)
+        path = os.path.join(self.root, "profile.json")
+        profile.save(path, top=1)
+        with open(path) as f:
+            self.assertEqual(len(json.load(f)["slowest_pages"]), 1)
+
+    def test_profile_build_leaves_unchanged_outputs_alone(self):
+        profile_build(self.static, self.content, self.template, self.dest)
+        output = os.path.join(self.dest, "index.html")
+        os.utime(output, ns=(0, 0))
+        write_file(os.path.join(self.dest, "stale", "index.html"), "old")
+        _, _, changed = profile_build(
+            self.static, self.content, self.template, self.dest
+        )
+        self.assertEqual(changed, [])
+        self.assertEqual(os.stat(output).st_mtime_ns, 0)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "stale")))
+
+    def test_profile_build_matches_generate_page(self):
+        profile_build(self.static, self.content, self.template, self.dest, "/site/")
+        with open(os.path.join(self.dest, "index.html")) as f:
+            profiled = f.read()
+        expected_dest = os.path.join(self.root, "expected")
+        generate_page(
+            os.path.join(self.content, "index.md"),
+            self.template,
+            expected_dest,
+            "/site/",
+        )
+        with open(os.path.join(expected_dest, "index.html")) as f:
+            self.assertEqual(profiled, f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
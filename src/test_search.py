@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+import unittest
+
+from markdown_blocks import parse_markdown
+from pagetext import PageText, page_url
+from search import SearchIndex, pack_postings, page_terms, unpack_postings
+from textnode import TextNode, TextType
+
+
+def page_text(markdown):
+    text = PageText()
+    _, metadata = parse_markdown(markdown, sink=text.text_nodes)
+    text.title = metadata.title
+    return text
+
+
+class TestSearchIndex(unittest.TestCase):
+    def test_parse_feeds_text_nodes(self):
+        text = page_text("# Hello **World**\n\n```\nprint(x)\n```\n\n- a [link](/x)")
+        self.assertEqual(
+            text.text_nodes,
+            [
+                TextNode("Hello ", TextType.TEXT),
+                TextNode("World", TextType.BOLD),
+                TextNode("print(x)\n", TextType.CODE),
+                TextNode("a ", TextType.TEXT),
+                TextNode("link", TextType.LINK, "/x"),
+            ],
+        )
+
+    def test_page_terms(self):
+        nodes = [TextNode("The Ring, the ", TextType.TEXT), TextNode("ring", "bold")]
+        self.assertEqual(page_terms(nodes), {"the": [0, 2], "ring": [1, 3]})
+
+    def test_pack_round_trip(self):
+        postings = [(0, [3, 7, 20]), (2, [0]), (5, [1, 2])]
+        packed = pack_postings(postings)
+        self.assertEqual(packed, [0, 3, 3, 4, 13, 2, 1, 0, 3, 2, 1, 1])
+        self.assertEqual(unpack_postings(packed), postings)
+
+    def test_page_url(self):
+        self.assertEqual(page_url("docs/index.html", "docs", "/site/"), "/site/")
+        self.assertEqual(
+            page_url(os.path.join("docs", "blog", "a", "index.html"), "docs", "/"),
+            "/blog/a/",
+        )
+
+    def test_build_and_incremental_update(self):
+        index = SearchIndex()
+        index.add("content/b.md", "docs/b/index.html", page_text("# B\n\nshared"))
+        index.add("content/a.md", "docs/a/index.html", page_text("# A\n\nshared a"))
+        built = index.build("docs")
+        self.assertEqual(built["pages"], [["/a/", "A"], ["/b/", "B"]])
+        self.assertEqual(
+            unpack_postings(built["terms"]["shared"]), [(0, [1]), (1, [1])]
+        )
+        self.assertEqual(unpack_postings(built["terms"]["a"]), [(0, [0, 2])])
+
+        index.add("content/b.md", "docs/b/index.html", page_text("# B\n\nchanged"))
+        index.retain(["content/b.md"])
+        built = index.build("docs")
+        self.assertEqual(built["pages"], [["/b/", "B"]])
+        self.assertNotIn("shared", built["terms"])
+
+    def test_save_load_and_write(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = os.path.join(tmp, ".build", "search.json")
+            index = SearchIndex()
+            index.add("a.md", os.path.join(tmp, "index.html"), page_text("# A"))
+            index.save(store)
+            loaded = SearchIndex.load(store)
+            self.assertEqual(loaded.pages, index.pages)
+            path = os.path.join(tmp, "search-index.json")
+            self.assertTrue(loaded.write(path, tmp))
+            self.assertFalse(loaded.write(path, tmp))
+            with open(path) as f:
+                self.assertEqual(json.load(f)["terms"], {"a": [0, 1, 0]})
+
+
+if __name__ == "__main__":
+    unittest.main()
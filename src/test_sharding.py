@@ -0,0 +1,82 @@
+import os
+import unittest
+
+from fixtures import TEMPLATE, SiteTestCase, write_file
+from generate_page import generate_pages_recursively
+from sharding import Shard, ShardMergeError, merge_shards, shard_index
+
+PAGES = ["index.md", "about/index.md", "blog/a/index.md", "blog/b/index.md"]
+
+
+class TestShard(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(Shard.parse("2/4"), Shard(2, 4))
+        self.assertNotEqual(Shard(2, 4), None)
+        for value in ["2", "0/4", "5/4", "a/4", "1/0"]:
+            with self.assertRaises(ValueError):
+                Shard.parse(value)
+
+    def test_shard_index_is_stable(self):
+        self.assertEqual(shard_index("blog/a/index.md", 4), 1)
+        self.assertEqual(shard_index("index.md", 4), 4)
+
+    def test_shards_partition_paths(self):
+        paths = [f"page-{i}/index.md" for i in range(100)]
+        owned = [
+            path
+            for index in range(1, 4)
+            for path in paths
+            if Shard(index, 3).owns(path)
+        ]
+        self.assertEqual(sorted(owned), sorted(paths))
+
+
+class TestShardedBuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.shards = os.path.join(self.root, "shards")
+        for page in PAGES:
+            write_file(os.path.join(self.content, page), f"# {page}")
+        write_file(os.path.join(self.static, "index.css"), "body {}")
+        write_file(self.template, TEMPLATE)
+
+    def build_shards(self, count=2):
+        paths = []
+        for index in range(1, count + 1):
+            shard = Shard(index, count)
+            paths.append(shard.output_path(self.shards))
+            generate_pages_recursively(
+                self.content, self.template, paths[-1], shard=shard
+            )
+        return paths
+
+    def test_merge_combines_shards_and_static(self):
+        paths = self.build_shards()
+        merged, copied = merge_shards(paths, self.static, self.content, self.dest)
+        self.assertEqual((merged, copied), (5, 5))
+        for page in PAGES:
+            output = os.path.join(self.dest, os.path.dirname(page), "index.html")
+            self.assertTrue(os.path.exists(output))
+        self.assertEqual(
+            merge_shards(paths, self.static, self.content, self.dest), (5, 0)
+        )
+
+    def test_merge_reports_missing_pages(self):
+        paths = self.build_shards()
+        with self.assertRaises(ShardMergeError) as context:
+            merge_shards(paths[:1], self.static, self.content, self.dest)
+        self.assertTrue(context.exception.missing)
+        self.assertFalse(os.path.exists(self.dest))
+
+    def test_merge_reports_duplicated_paths(self):
+        paths = self.build_shards()
+        write_file(os.path.join(paths[0], "index.css"), "body {}")
+        with self.assertRaises(ShardMergeError) as context:
+            merge_shards(paths, self.static, self.content, self.dest)
+        self.assertEqual(
+            context.exception.duplicates, [("index.css", [self.static, paths[0]])]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
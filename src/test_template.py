@@ -0,0 +1,109 @@
+import unittest
+
+import io
+
+from htmlnode import LeafNode, ParentNode
+from template import Template, referenced_urls, rewrite_basepath
+
+
+class TestRewriteBasepath(unittest.TestCase):
+    def test_rewrite_basepath(self):
+        html = '<a href="/blog">x</a><img src="/a.png" alt="a">'
+        self.assertEqual(
+            rewrite_basepath(html, "/site/"),
+            '<a href="/site/blog">x</a><img src="/site/a.png" alt="a">',
+        )
+
+    def test_rewrite_basepath_default(self):
+        html = '<a href="/blog">x</a>'
+        self.assertEqual(rewrite_basepath(html, "/"), html)
+
+    def test_rewrite_basepath_ignores_absolute_urls(self):
+        html = '<a href="https://example.com/">x</a>'
+        self.assertEqual(rewrite_basepath(html, "/site/"), html)
+
+    def test_rewrite_basepath_maps_fingerprinted_assets(self):
+        assets = {"/index.css": "/index.0123456789.css"}
+        html = '<link href="/index.css" /><a href="/index.css#top">x</a>'
+        self.assertEqual(
+            rewrite_basepath(html, "/", assets),
+            '<link href="/index.0123456789.css" /><a href="/index.0123456789.css#top">x</a>',
+        )
+        self.assertEqual(
+            rewrite_basepath('<a href="/blog">x</a>', "/site/", assets),
+            '<a href="/site/blog">x</a>',
+        )
+
+    def test_rewrite_basepath_maps_srcset_assets(self):
+        assets = {"/a.png": "/a.0123456789.png"}
+        html = '<img srcset="/a.png 2x, https://example.com/b.png 1x">'
+        self.assertEqual(
+            rewrite_basepath(html, "/site/", assets),
+            '<img srcset="/site/a.0123456789.png 2x, https://example.com/b.png 1x">',
+        )
+
+    def test_referenced_urls(self):
+        html = (
+            '<link href="/index.css?v=1"><a href="https://x.test/">x</a>'
+            '<img src="/a.png" srcset="/a-16w.png 16w, /a.png 64w">'
+        )
+        self.assertEqual(
+            referenced_urls(html), ["/index.css", "/a.png", "/a-16w.png", "/a.png"]
+        )
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compile(self):
+        template = Template(
+            '<title>{{ Title }}</title><link href="/index.css" />{{ Content }}',
+            "/site/",
+        )
+        self.assertEqual(template.slots, ["Title", "Content"])
+        self.assertEqual(
+            template.segments,
+            ["<title>", '</title><link href="/site/index.css" />', ""],
+        )
+
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        html = template.render({"Title": "Hello", "Content": "<p>World</p>"})
+        self.assertEqual(html, "<title>Hello</title><body><p>World</p></body>")
+
+    def test_render_rewrites_content_basepath(self):
+        template = Template('<link href="/index.css" />{{ Content }}', "/site/")
+        html = template.render({"Content": '<a href="/blog">blog</a>'})
+        self.assertEqual(
+            html, '<link href="/site/index.css" /><a href="/site/blog">blog</a>'
+        )
+
+    def test_write_streams_node_content(self):
+        template = Template('<link href="/index.css" />{{ Content }}', "/site/")
+        content = ParentNode(
+            "p", [LeafNode("blog", "a", {"href": "/blog"}), LeafNode(" post")]
+        )
+        out = io.StringIO()
+        template.write(out, {"Content": content})
+        self.assertEqual(
+            out.getvalue(),
+            '<link href="/site/index.css" /><p><a href="/site/blog">blog</a> post</p>',
+        )
+
+    def test_write_rewrites_assets_at_root_basepath(self):
+        template = Template(
+            '<link href="/index.css" />{{ Content }}',
+            assets={"/index.css": "/index.0123456789.css", "/a.png": "/a.1.png"},
+        )
+        out = io.StringIO()
+        template.write(out, {"Content": LeafNode("", "img", {"src": "/a.png"})})
+        self.assertEqual(
+            out.getvalue(),
+            '<link href="/index.0123456789.css" /><img src="/a.1.png"></img>',
+        )
+
+    def test_unknown_placeholder_is_kept(self):
+        template = Template("{{ Unknown }}{{ Content }}")
+        self.assertEqual(template.render({"Content": "x"}), "{{ Unknown }}x")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,8 @@ from enum import Enum
 
 from htmlnode import HTMLNode, LeafNode
 
+IMAGE_ASSET_ATTRIBUTES = ("width", "height", "srcset")
+
 
 class TextType(Enum):
     TEXT = "text"
@@ -13,6 +15,8 @@ class TextType(Enum):
 
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text: str, text_type: TextType, url: str = None):
         self.text = text
         self.text_type = text_type
@@ -31,7 +35,7 @@ class TextNode:
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
 
 
-def text_node_to_html_node(text_node: TextNode) -> HTMLNode:
+def text_node_to_html_node(text_node: TextNode, images=None) -> HTMLNode:
     if text_node.text_type == TextType.TEXT:
         return LeafNode(text_node.text)
     if text_node.text_type == TextType.BOLD:
@@ -47,9 +51,16 @@ def text_node_to_html_node(text_node: TextNode) -> HTMLNode:
             {"href": text_node.url},
         )
     if text_node.text_type == TextType.IMAGE:
-        return LeafNode(
-            text_node.text,
-            "img",
-            {"src": text_node.url, "alt": text_node.text},
-        )
+        asset = images.get(text_node.url) if images else None
+        if asset is None:
+            return LeafNode(
+                text_node.text,
+                "img",
+                {"src": text_node.url, "alt": text_node.text},
+            )
+        props = {"src": asset["src"], "alt": text_node.text}
+        for name in IMAGE_ASSET_ATTRIBUTES:
+            if name in asset:
+                props[name] = str(asset[name])
+        return LeafNode(text_node.text, "img", props)
     raise ValueError("Invalid text type")